@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_asgi_application()
+
+# settings가 load된 뒤에 import해야 함
+from core.metrics import register_worker  # noqa: E402
+from core.warmup import warm_up_worker  # noqa: E402
+
+register_worker()
+
+# async view의 DB query는 별도 thread에서 실행되므로 connection은 미리 열지 않음
+warm_up_worker(connect=False)
@@ -53,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 다른 middleware의 시간까지 포함하도록 가장 먼저 실행함
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,7 +94,41 @@ DATABASES = {
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        # 요청마다 connection을 새로 열지 않고 worker thread가 재사용함
+        # 재사용하기 전에 health check로 끊어진 connection을 다시 연결함
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': bool(
+            int(os.environ.get('DB_CONN_HEALTH_CHECKS', 1))
+        ),
+    }
+}
+
+# In-process connection pool shared by the threads of a worker
+# 요청이 끝나면 connection을 닫지 않고 pool에 반환하므로 CONN_MAX_AGE는 0으로 둠
+# CHECK_AFTER초 이상 쉬고 있던 connection은 꺼낼 때 health check를 실행함
+DB_POOL = {
+    'ENABLED': bool(int(os.environ.get('DB_POOL_ENABLED', 0))),
+    'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+    'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    'CHECK_AFTER': float(os.environ.get('DB_POOL_CHECK_AFTER', 30)),
+}
+if DB_POOL['ENABLED']:
+    DATABASES['default']['ENGINE'] = 'core.backends.postgresql_pool'
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# uwsgi worker끼리 cache를 공유하려면 file/memcached 등 공유 backend를 사용함
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
@@ -134,11 +170,42 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = '/static/static/'
-MEDIA_URL = '/static/media/'
+# media는 recipe 소유자만 받을 수 있도록 Django view를 거침
+MEDIA_URL = '/api/media/'
 
 STATIC_ROOT = '/vol/web/static'
 MEDIA_ROOT = '/vol/web/media'
 
+# 권한을 확인한 뒤 file 전송은 proxy의 internal location에 맡김
+# 0이면 (runserver 등 proxy가 없을 때) Django가 직접 file을 응답함
+MEDIA_ACCEL_REDIRECT = bool(
+    int(os.environ.get('MEDIA_ACCEL_REDIRECT', int(not DEBUG)))
+)
+MEDIA_ACCEL_PREFIX = '/protected/media/'
+
+
+# Limits of recipe image uploads, checked while the upload is streamed to TEMP_DIR
+# MAX_BYTES는 proxy의 client_max_body_size와 맞춤
+RECIPE_IMAGE_UPLOAD = {
+    'MAX_BYTES': int(
+        os.environ.get('RECIPE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)),
+    'MAX_DIMENSION': 8000,
+    'MAX_PIXELS': 40_000_000,
+    'TEMP_DIR': os.path.join(MEDIA_ROOT, 'uploads', 'tmp'),
+}
+
+# Resized JPEG/WebP copies of uploaded recipe images
+# SIZES는 variant 이름별 긴 변의 최대 pixel 수이며, WORKERS가 0이면 upload 중에 바로 생성함
+RECIPE_IMAGE_VARIANTS = {
+    'WORKERS': int(os.environ.get('RECIPE_IMAGE_VARIANT_WORKERS', 2)),
+    'QUALITY': 80,
+    'SIZES': {
+        'thumbnail': 160,
+        'small': 480,
+        'large': 1200,
+    },
+}
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -151,6 +218,36 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS' : 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Token authentication cache
+# TTL은 다른 uwsgi worker에 cache된 token이 계속 인증될 수 있는 최대 시간임
+AUTH_TOKEN_CACHE = {
+    'MAX_SIZE': int(os.environ.get('AUTH_TOKEN_CACHE_MAX_SIZE', 10000)),
+    'TTL': int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 30)),
+    'USE_DJANGO_CACHE': bool(
+        int(os.environ.get('AUTH_TOKEN_CACHE_USE_DJANGO_CACHE', 0))
+    ),
+}
+
+# Number of users whose pantry index is kept in each worker
+PANTRY_INDEX_MAX_USERS = int(os.environ.get('PANTRY_INDEX_MAX_USERS', 1000))
+
+# Build URL resolvers, serializer fields and DB connections when a worker
+# starts instead of on its first request
+WORKER_WARM_UP = bool(
+    int(os.environ.get('WORKER_WARM_UP', 0 if DEBUG else 1))
+)
+
+# Record request latency, SQL queries, response sizes and statuses
+# Prometheus가 api/health-check/metrics/에서 수집함
+METRICS_ENABLED = bool(int(os.environ.get('METRICS_ENABLED', 1)))
+
+# Default page size of the cursor paginated list APIs
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+
+# Version of the deployed code, e.g. the git commit
+# OpenAPI schema은 이 version이 바뀔 때만 다시 생성함
+APP_VERSION = os.environ.get('APP_VERSION', '')
+
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
\ No newline at end of file
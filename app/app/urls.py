@@ -13,31 +13,31 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from django.contrib import admin
 from django.urls import path, include
-from django.conf.urls.static import static
-from django.conf import settings
 
 from core import views as core_views
+from core.schema import CachedSpectacularAPIView
+from recipe.views import RecipeImageView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/health-check/', core_views.health_check, name='health-check'),
-    path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
+    path('api/health-check/db-pool/', core_views.db_pool, name='db-pool'),
+    path('api/health-check/metrics/', core_views.metrics, name='metrics'),
+    path(
+        'api/schema/',
+        CachedSpectacularAPIView.as_view(),
+        name='api-schema',
+    ),
     path(
         'api/docs/',
         SpectacularSwaggerView.as_view(url_name='api-schema'),
         name='api-docs',),
     path('api/user/', include('user.urls')),
     path('api/recipe/', include('recipe.urls')),
-]
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT,
-    )
\ No newline at end of file
+    # ASGI server로 실행하는 read only API
+    path('api/async/recipe/', include('recipe.async_urls')),
+    path('api/media/<path:name>', RecipeImageView.as_view(), name='media'),
+]
\ No newline at end of file
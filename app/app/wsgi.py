@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+# settings가 load된 뒤에 import해야 함
+from core.metrics import register_worker  # noqa: E402
+from core.warmup import warm_up_worker  # noqa: E402
+
+register_worker()
+
+warm_up_worker()
@@ -0,0 +1,156 @@
+"""
+Authentication classes for the APIs
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+# shared cache에는 token을 추측할 수 있는 key로 저장하지 않음
+TOKEN_KEY = 'auth-token:{digest}'
+USER_VERSION_KEY = 'auth-token-version:{user_id}'
+
+
+def token_cache_key(key):
+    """Return the shared cache key of a token"""
+    return TOKEN_KEY.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+
+class TokenCache:
+    """Bounded in-process LRU cache of tokens with a TTL"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value and evict the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove a value from the cache"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_user(self, user_id):
+        """Remove every token of the user from the cache"""
+        with self._lock:
+            for key, (expires, entry) in list(self._entries.items()):
+                user = entry[0]
+                if user.pk == user_id:
+                    del self._entries[key]
+
+    def clear(self):
+        """Remove every value from the cache"""
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    max_size=settings.AUTH_TOKEN_CACHE['MAX_SIZE'],
+    ttl=settings.AUTH_TOKEN_CACHE['TTL'],
+)
+
+
+def bump_user_version(user_id):
+    """Invalidate the cached tokens of the user in every worker"""
+    # version을 올려 이전 version으로 저장된 token을 모두 무효화함
+    version_key = USER_VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # shared cache에서 다시 채운 local entry는 TTL이 새로 시작되므로
+        # 이전 version의 entry가 모두 만료될 때까지 version을 유지함
+        cache.set(version_key, 1, settings.AUTH_TOKEN_CACHE['TTL'] * 2)
+
+
+def invalidate_token(key, user_id):
+    """Remove a token from the local and the shared cache"""
+    token_cache.delete(key)
+    if settings.AUTH_TOKEN_CACHE['USE_DJANGO_CACHE']:
+        cache.delete(token_cache_key(key))
+        # 다른 worker의 local cache에 남은 token도 다음 요청에서 무효화함
+        bump_user_version(user_id)
+
+
+def invalidate_user_tokens(user_id):
+    """Remove every token of the user from the local and the shared cache"""
+    token_cache.delete_user(user_id)
+    if settings.AUTH_TOKEN_CACHE['USE_DJANGO_CACHE']:
+        bump_user_version(user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication which caches the token and user lookup"""
+    # 요청마다 Token + User join query를 실행하지 않도록 worker 안에 cache함
+    # shared cache를 사용하지 않으면 다른 worker의 cache는 직접 지울 수 없으므로
+    # TTL로 stale 기간을 제한함
+
+    def _get_cached(self, key):
+        """Return the cached (user, token) pair for the key"""
+        entry = token_cache.get(key)
+        if not settings.AUTH_TOKEN_CACHE['USE_DJANGO_CACHE']:
+            return entry and entry[:2]
+
+        local = entry is not None
+        if not local:
+            entry = cache.get(token_cache_key(key))
+            if entry is None:
+                return None
+        # 다른 worker에서 token이 삭제되거나 user가 바뀌었을 수 있으므로
+        # local cache hit이어도 매번 user의 version을 확인함
+        user, token, version = entry
+        if cache.get(USER_VERSION_KEY.format(user_id=user.pk), 0) != version:
+            token_cache.delete(key)
+            return None
+        if not local:
+            token_cache.set(key, entry)
+
+        return user, token
+
+    def _set_cached(self, key, user, token):
+        """Store the user and token in the local and the shared cache"""
+        if not settings.AUTH_TOKEN_CACHE['USE_DJANGO_CACHE']:
+            token_cache.set(key, (user, token, 0))
+            return
+
+        version = cache.get(USER_VERSION_KEY.format(user_id=user.pk), 0)
+        entry = (user, token, version)
+        token_cache.set(key, entry)
+        cache.set(
+            token_cache_key(key), entry, settings.AUTH_TOKEN_CACHE['TTL'])
+
+    def authenticate_credentials(self, key):
+        """Return the user and token, querying the database on a miss"""
+        entry = self._get_cached(key)
+        if entry is None:
+            entry = super().authenticate_credentials(key)
+            self._set_cached(key, *entry)
+
+        user, token = entry
+        # view에서 request.user를 수정해도 cache된 객체가 바뀌지 않도록 복사함
+        return copy.copy(user), token
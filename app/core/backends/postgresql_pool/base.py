@@ -0,0 +1,61 @@
+"""
+PostgreSQL backend which borrows connections from an in-process pool
+"""
+from django.conf import settings
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from core.db_pool import get_pool
+
+
+def is_usable(conn):
+    """Return whether a pooled connection still answers queries"""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Database wrapper which returns connections to the pool on close"""
+    # 요청이 끝나면 Django가 close()를 호출하므로 그때 pool에 반환함
+
+    @property
+    def pool(self):
+        """Return the connection pool of this database"""
+        check_after = None
+        if self.settings_dict['CONN_HEALTH_CHECKS']:
+            check_after = settings.DB_POOL['CHECK_AFTER']
+
+        return get_pool(self.alias, self._connect, is_usable, check_after)
+
+    def _connect(self):
+        """Open a new connection for the pool"""
+        return super().get_new_connection(self.get_connection_params())
+
+    def get_new_connection(self, conn_params):
+        """Borrow a connection from the pool"""
+        return self.pool.acquire()
+
+    def _close(self):
+        """Return the connection to the pool, discarding broken ones"""
+        conn = self.connection
+        if conn is None:
+            return
+        idle = extensions.TRANSACTION_STATUS_IDLE
+        try:
+            # 다음 요청이 남은 transaction을 이어 받지 않도록 rollback함
+            if not conn.closed and conn.get_transaction_status() != idle:
+                conn.rollback()
+            # atomic block 안에서 닫히면 Django가 block이 끝날 때까지
+            # connection을 참조하므로 다른 thread에 빌려주지 않음
+            reusable = not conn.closed and not self.in_atomic_block
+        except base.Database.Error:
+            reusable = False
+        if reusable:
+            self.pool.release(conn)
+        else:
+            self.pool.discard(conn)
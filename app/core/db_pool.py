@@ -0,0 +1,154 @@
+"""
+In-process pool of database connections
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection is returned to the pool in time"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of connections shared by the threads of a worker"""
+
+    def __init__(self, connect, is_usable, max_size, timeout,
+                 check_after=None):
+        self.connect = connect
+        self.is_usable = is_usable
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        # fork된 process에서는 부모의 connection을 사용하지 않도록 pid를 기록함
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def _checkout(self):
+        """Take an idle connection or reserve a slot for a new one"""
+        with self._cond:
+            started = None
+            while not self._idle and self._size >= self.max_size:
+                now = time.monotonic()
+                if started is None:
+                    started = now
+                    self.waits += 1
+                remaining = started + self.timeout - now
+                if remaining <= 0:
+                    self.timeouts += 1
+                    self.wait_seconds += now - started
+                    raise PoolTimeout(
+                        f'No database connection was free within '
+                        f'{self.timeout} seconds.')
+                self._cond.wait(remaining)
+            if started is not None:
+                self.wait_seconds += time.monotonic() - started
+            if self._idle:
+                # 최근에 반환된 connection부터 사용하여 오래 쉰 connection이
+                # 자연스럽게 health check 대상이 되도록 함
+                return self._idle.pop()
+            self._size += 1
+
+            return None, None
+
+    def acquire(self):
+        """Return a usable connection, waiting while the pool is full"""
+        while True:
+            conn, returned_at = self._checkout()
+            if conn is None:
+                try:
+                    conn = self.connect()
+                except BaseException:
+                    self._forget()
+                    raise
+                break
+            idle = time.monotonic() - returned_at
+            if (self.check_after is None or idle < self.check_after
+                    or self.is_usable(conn)):
+                break
+            self.discard(conn)
+        with self._cond:
+            self.checkouts += 1
+
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool"""
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _forget(self):
+        """Free the slot of a connection which is no longer pooled"""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def discard(self, conn):
+        """Close a broken connection and free its slot"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self.discarded += 1
+        self._forget()
+
+    def stats(self):
+        """Return the size and usage counters of the pool"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'in_use': self._size - len(self._idle),
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 6),
+                'timeouts': self.timeouts,
+                'discarded': self.discarded,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, connect, is_usable, check_after=None):
+    """Return the pool of the database alias for this process"""
+    config = settings.DB_POOL
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            # uwsgi master에서 열린 connection은 fork된 worker끼리 socket을
+            # 공유하므로 닫지 않고 버린 뒤 새 pool을 만듦
+            pool = _pools[alias] = ConnectionPool(
+                connect,
+                is_usable,
+                max_size=config['MAX_SIZE'],
+                timeout=config['TIMEOUT'],
+                check_after=check_after,
+            )
+
+        return pool
+
+
+def pool_stats():
+    """Return the stats of the pools of this process by database alias"""
+    with _pools_lock:
+        pools = [
+            (alias, pool) for alias, pool in _pools.items()
+            if pool.pid == os.getpid()
+        ]
+
+    return {alias: pool.stats() for alias, pool in pools}
@@ -0,0 +1,290 @@
+"""
+Load generator for the recipe API, driven against a running server
+"""
+import http.client
+import io
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from PIL import Image
+
+# 요청 종류별 기본 비율
+DEFAULT_MIX = {
+    'recipes': 50,
+    'tags': 15,
+    'ingredients': 15,
+    'token': 10,
+    'upload': 10,
+}
+PERCENTILES = (50, 95, 99)
+IMAGE_SIZE = (320, 240)
+
+
+class Account:
+    """A seeded user whose data the requests read and write"""
+
+    def __init__(self, email, password, token, recipe_ids, tag_ids,
+                 ingredient_ids):
+        self.email = email
+        self.password = password
+        self.headers = {'Authorization': f'Token {token}'}
+        self.recipe_ids = recipe_ids
+        self.tag_ids = tag_ids
+        self.ingredient_ids = ingredient_ids
+
+
+def recipes_request(rng, account, images):
+    """List, filter or retrieve the recipes of the user"""
+    tags = ','.join(map(str, rng.sample(
+        account.tag_ids, min(2, len(account.tag_ids)))))
+    ingredients = ','.join(map(str, rng.sample(
+        account.ingredient_ids, min(2, len(account.ingredient_ids)))))
+    path = rng.choice([
+        '/api/recipe/recipes/',
+        f'/api/recipe/recipes/?tags={tags}',
+        f'/api/recipe/recipes/?ingredients={ingredients}',
+        f'/api/recipe/recipes/{rng.choice(account.recipe_ids)}/',
+    ])
+
+    return 'GET', path, None, account.headers
+
+
+def tags_request(rng, account, images):
+    """List the tags of the user"""
+    path = rng.choice([
+        '/api/recipe/tags/',
+        '/api/recipe/tags/?assigned_only=1',
+    ])
+
+    return 'GET', path, None, account.headers
+
+
+def ingredients_request(rng, account, images):
+    """List the ingredients of the user"""
+    path = rng.choice([
+        '/api/recipe/ingredients/',
+        '/api/recipe/ingredients/?assigned_only=1',
+    ])
+
+    return 'GET', path, None, account.headers
+
+
+def token_request(rng, account, images):
+    """Log in to get the token of the user"""
+    body = json.dumps({'email': account.email, 'password': account.password})
+
+    return 'POST', '/api/user/token/', body.encode(), {
+        'Content-Type': 'application/json',
+    }
+
+
+def upload_request(rng, account, images):
+    """Upload an image to one of the recipes of the user"""
+    boundary = uuid.uuid4().hex
+    body = b''.join([
+        f'--{boundary}\r\n'
+        'Content-Disposition: form-data; name="image"; '
+        'filename="image.jpg"\r\n'
+        'Content-Type: image/jpeg\r\n\r\n'.encode(),
+        rng.choice(images),
+        f'\r\n--{boundary}--\r\n'.encode(),
+    ])
+    path = (
+        f'/api/recipe/recipes/{rng.choice(account.recipe_ids)}/upload-image/')
+
+    return 'POST', path, body, {
+        **account.headers,
+        'Content-Type': f'multipart/form-data; boundary={boundary}',
+    }
+
+
+REQUESTS = {
+    'recipes': recipes_request,
+    'tags': tags_request,
+    'ingredients': ingredients_request,
+    'token': token_request,
+    'upload': upload_request,
+}
+
+
+def parse_mix(value):
+    """Parse 'recipes=50,tags=10' into the weight of each request"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in REQUESTS:
+            raise ValueError(f"Unknown request '{name}'.")
+        mix[name] = float(weight)
+        if mix[name] < 0:
+            raise ValueError(f"Weight of '{name}' is negative.")
+    if not any(mix.values()):
+        raise ValueError('The mix has no requests.')
+
+    return mix
+
+
+def sample_images(count, seed=0):
+    """Return distinct JPEG images, like photos they barely compress"""
+    # 같은 image는 storage에서 중복 제거되므로 서로 다른 image를 만듦
+    rng = random.Random(seed)
+    images = []
+    for _ in range(count):
+        pixels = rng.randbytes(IMAGE_SIZE[0] * IMAGE_SIZE[1] * 3)
+        buffer = io.BytesIO()
+        Image.frombytes('RGB', IMAGE_SIZE, pixels).save(
+            buffer, format='JPEG', quality=85)
+        images.append(buffer.getvalue())
+
+    return images
+
+
+class LoadGenerator:
+    """Send a weighted mix of requests from concurrent threads"""
+
+    def __init__(self, url, accounts, mix, concurrency, images, seed=0,
+                 timeout=30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        self.accounts = accounts
+        self.names = [name for name, weight in mix.items() if weight]
+        self.weights = [mix[name] for name in self.names]
+        self.concurrency = concurrency
+        self.images = images
+        self.seed = seed
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def send(self, conn, method, path, body, headers):
+        """Send a request and return its status, 0 if it failed"""
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            res = conn.getresponse()
+            res.read()
+        except (OSError, http.client.HTTPException):
+            # 다음 요청에서 다시 연결함
+            conn.close()
+            return 0
+
+        return res.status
+
+    def worker(self, index, deadline, remaining, samples):
+        """Send requests until the deadline or the request count is reached"""
+        rng = random.Random(f'{self.seed}-{index}')
+        account = self.accounts[index % len(self.accounts)]
+        # thread마다 keep-alive connection 하나를 사용함
+        conn = self.connection_class(
+            self.host, self.port, timeout=self.timeout)
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                if remaining is not None:
+                    with self._lock:
+                        if not remaining[0]:
+                            return
+                        remaining[0] -= 1
+                name = rng.choices(self.names, self.weights)[0]
+                request = REQUESTS[name](rng, account, self.images)
+                start = time.perf_counter()
+                status = self.send(conn, *request)
+                samples.append((
+                    name,
+                    (time.perf_counter() - start) * 1000,
+                    status,
+                ))
+        finally:
+            conn.close()
+
+    def run(self, duration=None, requests=None):
+        """Return the (name, ms, status) samples and the elapsed seconds"""
+        deadline = None
+        if duration is not None:
+            deadline = time.monotonic() + duration
+        remaining = None if requests is None else [requests]
+        samples = [[] for _ in range(self.concurrency)]
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(index, deadline, remaining, samples[index]),
+            )
+            for index in range(self.concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return (
+            [sample for thread in samples for sample in thread],
+            time.perf_counter() - start,
+        )
+
+
+def stats(samples, elapsed):
+    """Return the throughput, errors and latency percentiles of samples"""
+    timings = [ms for _, ms, _ in samples]
+    errors = sum(1 for _, _, status in samples if not 200 <= status < 300)
+    if len(timings) > 1:
+        cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    else:
+        cuts = timings * 99
+
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4),
+        'rps': round(len(samples) / elapsed, 2),
+        **{f'p{p}_ms': round(cuts[p - 1], 2) for p in PERCENTILES},
+    }
+
+
+def summarize(samples, elapsed, **config):
+    """Return the report of a run"""
+    endpoints = {}
+    for name, ms, status in samples:
+        endpoints.setdefault(name, []).append((name, ms, status))
+
+    return {
+        'config': config,
+        'elapsed_s': round(elapsed, 3),
+        'total': stats(samples, elapsed),
+        'endpoints': {
+            name: stats(endpoint, elapsed)
+            for name, endpoint in sorted(endpoints.items())
+        },
+    }
+
+
+def compare(report, baseline, tolerance=0.1):
+    """Return the regressions of a report against a baseline report"""
+    regressions = []
+    current = {'total': report['total'], **report['endpoints']}
+    previous = {'total': baseline['total'], **baseline['endpoints']}
+    for name, before in previous.items():
+        after = current.get(name)
+        if after is None:
+            continue
+        for p in PERCENTILES:
+            key = f'p{p}_ms'
+            if after[key] > before[key] * (1 + tolerance):
+                regressions.append(
+                    f'{name} {key}: {after[key]} > {before[key]}')
+        if after['rps'] < before['rps'] * (1 - tolerance):
+            regressions.append(
+                f"{name} rps: {after['rps']} < {before['rps']}")
+        if after['error_rate'] > before['error_rate']:
+            regressions.append(
+                f"{name} error_rate: "
+                f"{after['error_rate']} > {before['error_rate']}")
+
+    return regressions
@@ -0,0 +1,147 @@
+"""
+Django command to compare the WSGI and ASGI recipe APIs under concurrency.
+"""
+import asyncio
+import random
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import (
+    AsyncClient,
+    Client,
+    override_settings,
+)
+from rest_framework.authtoken.models import Token
+
+from core.seeding import seed_recipes
+
+
+def request_paths(prefix, tag_ids, count, seed=0):
+    """Return a mix of list requests like the clients send"""
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        paths.append(rng.choice([
+            f'{prefix}recipes/',
+            f'{prefix}recipes/?tags={rng.choice(tag_ids)}',
+            f'{prefix}recipes/?search={rng.choice(["spicy", "soup", "rice"])}',
+            f'{prefix}tags/?assigned_only=1',
+        ]))
+
+    return paths
+
+
+def summary(name, timings, elapsed):
+    """Return the throughput and latency percentiles of a run"""
+    quantiles = statistics.quantiles(timings, n=100)
+
+    return (
+        f'{name}: {len(timings) / elapsed:.1f} req/s '
+        f'p50={quantiles[49]:.1f}ms p95={quantiles[94]:.1f}ms'
+    )
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the WSGI and ASGI recipe APIs"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Number of requests in flight on the ASGI path',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of threads serving the WSGI path, like uwsgi workers',
+        )
+
+    def run_wsgi(self, paths, token, workers):
+        """Send the requests from a fixed number of blocking workers"""
+        remaining = iter(paths)
+        lock = threading.Lock()
+        timings = []
+
+        def worker():
+            client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            try:
+                while True:
+                    with lock:
+                        path = next(remaining, None)
+                    if path is None:
+                        return
+                    start = time.perf_counter()
+                    res = client.get(path)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    assert res.status_code == 200, res.content
+            finally:
+                # thread마다 열린 connection을 닫음
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return timings, time.perf_counter() - start
+
+    async def run_asgi(self, paths, token, concurrency):
+        """Send the requests with a bounded number in flight"""
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        timings = []
+
+        async def send(path):
+            async with semaphore:
+                start = time.perf_counter()
+                res = await client.get(path, AUTHORIZATION=f'Token {token}')
+                timings.append((time.perf_counter() - start) * 1000)
+                assert res.status_code == 200, res.content
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(path) for path in paths))
+
+        return timings, time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        # 여러 thread의 connection이 같은 데이터를 조회해야 하므로
+        # rollback 대신 commit 후 마지막에 사용자를 삭제함
+        user = get_user_model().objects.create_user(
+            email=f'bench-{uuid.uuid4().hex}@example.com')
+        try:
+            tag_ids, _ = seed_recipes(user, recipes=options['recipes'])
+            token = Token.objects.create(user=user).key
+            count = options['requests']
+            # 응답 cache 없이 DB를 조회하는 시간을 비교함
+            with override_settings(
+                ALLOWED_HOSTS=['testserver', '127.0.0.1'],
+                CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+                }},
+            ):
+                timings, elapsed = self.run_wsgi(
+                    request_paths('/api/recipe/', tag_ids, count),
+                    token,
+                    options['workers'],
+                )
+                self.stdout.write(summary('wsgi', timings, elapsed))
+                timings, elapsed = asyncio.run(self.run_asgi(
+                    request_paths('/api/async/recipe/', tag_ids, count),
+                    token,
+                    options['concurrency'],
+                ))
+                self.stdout.write(summary('asgi', timings, elapsed))
+        finally:
+            user.delete()
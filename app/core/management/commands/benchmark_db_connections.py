@@ -0,0 +1,82 @@
+"""
+Django command to measure the per-request cost of database connections.
+"""
+import statistics
+import time
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.db import connection
+from django.db.utils import load_backend
+
+from core.db_pool import pool_stats
+
+POOL_ENGINE = 'core.backends.postgresql_pool'
+
+
+class Command(BaseCommand):
+    """Django command to compare new, persistent and pooled connections"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def _wrapper(self, alias, engine, **overrides):
+        """Return a new database wrapper for the default database"""
+        settings_dict = {**connection.settings_dict, **overrides}
+        settings_dict['ENGINE'] = engine
+
+        return load_backend(engine).DatabaseWrapper(settings_dict, alias)
+
+    def _time(self, wrapper, requests):
+        """Return per-request timings in ms of a one query request"""
+        timings = []
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                # request_started/finished signal과 같이 요청 전후에
+                # 오래되었거나 끊어진 connection을 정리함
+                wrapper.close_if_unusable_or_obsolete()
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                wrapper.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            wrapper.close()
+
+        return timings
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark needs a PostgreSQL database.')
+
+        engine = 'django.db.backends.postgresql'
+        modes = [
+            ('new', self._wrapper(
+                'bench-new', engine, CONN_MAX_AGE=0)),
+            ('persistent', self._wrapper(
+                'bench-persistent', engine,
+                CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True)),
+            ('pooled', self._wrapper(
+                'bench-pooled', POOL_ENGINE,
+                CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=True)),
+        ]
+        baseline = None
+        for name, wrapper in modes:
+            timings = self._time(wrapper, options['requests'])
+            mean = statistics.mean(timings)
+            p95 = statistics.quantiles(timings, n=100)[94]
+            line = f'{name}: mean={mean:.3f}ms p95={p95:.3f}ms'
+            if baseline is None:
+                baseline = mean
+            else:
+                line += f' saved={baseline - mean:.3f}ms/request'
+            self.stdout.write(line)
+
+        stats = pool_stats().get('bench-pooled', {})
+        self.stdout.write(
+            f"pool: checkouts={stats.get('checkouts')} "
+            f"size={stats.get('size')} waits={stats.get('waits')}"
+        )
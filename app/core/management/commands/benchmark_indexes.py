@@ -0,0 +1,105 @@
+"""
+Django command to show the query plans of the per-user indexes.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.db import (
+    connection,
+    transaction,
+)
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+from core.seeding import seed_recipes
+
+
+class Command(BaseCommand):
+    """Django command to compare query plans with and without indexes"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes-per-user', type=int, default=10000)
+        parser.add_argument('--tags-per-user', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=100)
+
+    def _queries(self, user, names, page_size):
+        """Return the hot queries of the recipe APIs"""
+        return {
+            'recipe list': Recipe.objects.filter(
+                user=user).order_by('-id')[:page_size],
+            'tag list': Tag.objects.filter(
+                user=user).order_by('-name', '-id')[:page_size],
+            'tag lookup': Tag.objects.filter(user=user, name__in=names),
+        }
+
+    def _explain(self, queries):
+        """Print the plan and the run time of every query"""
+        options = {'analyze': True, 'buffers': True}
+        for label, queryset in queries.items():
+            start = time.perf_counter()
+            list(queryset)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stdout.write(f'-- {label} ({elapsed:.2f}ms)')
+            self.stdout.write(queryset.explain(**options))
+
+    def _drop_indexes(self):
+        """Drop the per-user indexes inside the current transaction"""
+        # PostgreSQL은 DDL도 transaction 안에서 rollback 할 수 있음
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for index in Recipe._meta.indexes:
+                schema_editor.remove_index(Recipe, index)
+            for model in (Tag, Ingredient):
+                for constraint in model._meta.constraints:
+                    schema_editor.remove_constraint(model, constraint)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark requires PostgreSQL.')
+
+        # seed한 데이터와 삭제한 index가 남지 않도록 transaction을 rollback함
+        with transaction.atomic():
+            self.stdout.write('Seeding data...')
+            users = [
+                get_user_model().objects.create_user(
+                    email=f'bench-{uuid.uuid4().hex}@example.com')
+                for _ in range(options['users'])
+            ]
+            for seed, user in enumerate(users):
+                seed_recipes(
+                    user,
+                    recipes=options['recipes_per_user'],
+                    tags=options['tags_per_user'],
+                    ingredients=options['tags_per_user'],
+                    tags_per_recipe=1,
+                    ingredients_per_recipe=1,
+                    seed=seed,
+                )
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            user = users[len(users) // 2]
+            names = list(
+                Tag.objects.filter(user=user).values_list('name', flat=True)
+                [:30]
+            )
+            queries = self._queries(user, names, options['page_size'])
+
+            self.stdout.write(self.style.SUCCESS('With per-user indexes'))
+            self._explain(queries)
+            self._drop_indexes()
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.stdout.write(self.style.SUCCESS('Without per-user indexes'))
+            self._explain(queries)
+
+            transaction.set_rollback(True)
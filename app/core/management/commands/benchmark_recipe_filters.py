@@ -0,0 +1,84 @@
+"""
+Django command to compare recipe filter implementations.
+"""
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Recipe
+from core.seeding import seed_recipes
+from recipe.filters import (
+    MATCH_ALL,
+    MATCH_ANY,
+    filter_by_related,
+)
+
+
+def join_filter(queryset, ids, match):
+    """Filter recipes by tags with joins, as the API used to"""
+    if match == MATCH_ALL:
+        for tag_id in ids:
+            queryset = queryset.filter(tags__id=tag_id)
+        return queryset.distinct()
+
+    return queryset.filter(tags__id__in=ids).distinct()
+
+
+class Command(BaseCommand):
+    """Django command to benchmark join and subquery recipe filters"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=100)
+
+    def _time(self, queryset, page_size, repeat):
+        """Return the median time in ms to fetch a page of recipe ids"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ids = list(
+                queryset.order_by('-id').values_list('id', flat=True)
+                [:page_size]
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return statistics.median(timings), ids
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        # 측정에 사용한 데이터가 남지 않도록 transaction을 rollback함
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email=f'bench-{uuid.uuid4().hex}@example.com')
+            tag_ids, _ = seed_recipes(
+                user, recipes=options['recipes'], tags=options['tags'])
+            recipes = Recipe.objects.filter(user=user)
+            rng = random.Random(0)
+
+            for match in (MATCH_ANY, MATCH_ALL):
+                for size in (1, 2, 3):
+                    ids = rng.sample(tag_ids, size)
+                    join_ms, join_ids = self._time(
+                        join_filter(recipes, ids, match),
+                        options['page_size'], options['repeat'])
+                    sub_ms, sub_ids = self._time(
+                        filter_by_related(recipes, 'tags', ids, match),
+                        options['page_size'], options['repeat'])
+                    if join_ids != sub_ids:
+                        self.stderr.write(self.style.ERROR(
+                            f'match={match} tags={size}: results differ'))
+                    self.stdout.write(
+                        f'match={match} tags={size} '
+                        f'join+distinct={join_ms:.2f}ms '
+                        f'subquery={sub_ms:.2f}ms '
+                        f'speedup={join_ms / sub_ms:.1f}x'
+                    )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,80 @@
+"""
+Django command to measure worker startup and first-request latency.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from rest_framework.authtoken.models import Token
+
+from core.seeding import seed_recipes
+
+STEPS = (
+    'import_ms',
+    'setup_ms',
+    'application_ms',
+    'first_request_ms',
+    'second_request_ms',
+)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark cold worker startup"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--recipes', type=int, default=100)
+        parser.add_argument('--path', default='/api/recipe/recipes/')
+
+    def probe(self, path, token, warm_up):
+        """Return the timings of a fresh worker process"""
+        # 이미 import된 module의 영향을 받지 않도록 새 process에서 측정함
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get(
+                'DJANGO_SETTINGS_MODULE', 'app.settings'),
+            'ALLOWED_HOSTS': 'localhost',
+            'WORKER_WARM_UP': '1' if warm_up else '0',
+        }
+        result = subprocess.run(
+            [sys.executable, '-m', 'core.startup_probe', path, token],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr or result.stdout)
+
+        return json.loads(result.stdout)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        # 다른 process가 조회해야 하므로 commit 후 마지막에 사용자를 삭제함
+        user = get_user_model().objects.create_user(
+            email=f'bench-{uuid.uuid4().hex}@example.com')
+        try:
+            seed_recipes(user, recipes=options['recipes'])
+            token = Token.objects.create(user=user).key
+            for warm_up in (False, True):
+                runs = [
+                    self.probe(options['path'], token, warm_up)
+                    for _ in range(options['repeat'])
+                ]
+                medians = ' '.join(
+                    f'{step}={statistics.median(r[step] for r in runs):.1f}'
+                    for step in STEPS
+                )
+                name = 'warm-up' if warm_up else 'lazy'
+                self.stdout.write(f'{name}: {medians}')
+        finally:
+            user.delete()
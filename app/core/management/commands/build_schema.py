@@ -0,0 +1,34 @@
+"""
+Django command to write the OpenAPI schema files into STATIC_ROOT.
+"""
+import glob
+import os
+
+from django.core.management.base import BaseCommand
+
+from core.schema import (
+    SCHEMA_RENDERERS,
+    code_version,
+    generate_schema,
+    schema_path,
+    write_schema,
+)
+
+
+class Command(BaseCommand):
+    """Django command to build the OpenAPI schema of this code version"""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        written = set()
+        for fmt in SCHEMA_RENDERERS:
+            written.add(write_schema(fmt, generate_schema(fmt)))
+
+        # 이전 version의 schema file을 삭제함
+        for path in glob.glob(os.path.join(
+                os.path.dirname(schema_path('yaml')), '*')):
+            if path not in written:
+                os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Built the schema of version {code_version()}'))
@@ -0,0 +1,77 @@
+"""
+Django command to delete recipe images which are no longer referenced.
+"""
+import os
+import shutil
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from core.models import (
+    Recipe,
+    recipe_image_file_path,
+)
+from recipe.images import variant_dir
+
+
+def iter_blobs(storage, directory):
+    """Yield the names of the stored images under the directory"""
+    if not storage.exists(directory):
+        return
+    dirs, files = storage.listdir(directory)
+    for filename in files:
+        yield os.path.join(directory, filename)
+    for name in dirs:
+        # variant는 원본 blob과 함께 삭제함
+        if name != 'variants':
+            yield from iter_blobs(storage, os.path.join(directory, name))
+
+
+class Command(BaseCommand):
+    """Django command to garbage collect recipe images"""
+    help = 'Delete stored recipe images which no recipe references.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--grace-seconds',
+            type=int,
+            default=60 * 60,
+            help='Keep images written or reused within this many seconds',
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        storage = Recipe._meta.get_field('image').storage
+        root = os.path.dirname(recipe_image_file_path(None, 'image'))
+        blobs = iter_blobs(storage, root)
+        deleted = kept = 0
+        while True:
+            batch = list(islice(blobs, options['batch_size']))
+            if not batch:
+                break
+            referenced = set(Recipe.objects.filter(
+                image__in=batch,
+            ).values_list('image', flat=True))
+            # upload 후 recipe row가 저장되기 전의 blob을 지우지 않도록
+            # 최근에 쓰였거나 재사용된 blob은 남겨 둠
+            cutoff = time.time() - options['grace_seconds']
+            for name in batch:
+                if (name in referenced
+                        or storage.get_modified_time(name).timestamp()
+                        > cutoff):
+                    kept += 1
+                    continue
+                deleted += 1
+                if not options['dry_run']:
+                    storage.delete(name)
+                    shutil.rmtree(
+                        storage.path(variant_dir(name)),
+                        ignore_errors=True,
+                    )
+
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {deleted} images, kept {kept}'))
@@ -0,0 +1,181 @@
+"""
+Django command to load test a running server with seeded recipe data.
+"""
+import argparse
+import json
+import secrets
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from rest_framework.authtoken.models import Token
+
+from core.loadtest import (
+    DEFAULT_MIX,
+    Account,
+    LoadGenerator,
+    compare,
+    parse_mix,
+    sample_images,
+    summarize,
+)
+from core.models import Recipe
+from core.seeding import seed_recipes
+
+
+class Command(BaseCommand):
+    """Django command to measure the throughput and latency of the API"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='http://127.0.0.1:8000',
+            help='Server sharing the database with this command',
+        )
+        parser.add_argument(
+            '--mix',
+            type=self.mix,
+            default=DEFAULT_MIX,
+            help='Weights of the requests, e.g. recipes=50,tags=15,'
+                 'ingredients=15,token=10,upload=10',
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Seconds to send requests for',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            help='Number of requests to send instead of a duration',
+        )
+        parser.add_argument(
+            '--warm-up',
+            type=float,
+            default=3,
+            help='Seconds of requests sent before measuring',
+        )
+        parser.add_argument('--users', type=int, default=4)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='File to write the report to')
+        parser.add_argument(
+            '--baseline',
+            help='Report to compare against, or to replace with '
+                 '--save-baseline',
+        )
+        parser.add_argument('--save-baseline', action='store_true')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.1,
+            help='Allowed slowdown against the baseline, 0.1 is 10%%',
+        )
+
+    def mix(self, value):
+        """Parse the --mix option"""
+        try:
+            return parse_mix(value)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(exc)
+
+    def create_accounts(self, prefix, users, recipes, seed):
+        """Create users with seeded recipes and return their accounts"""
+        accounts = []
+        for index in range(users):
+            password = secrets.token_urlsafe()
+            user = get_user_model().objects.create_user(
+                email=f'{prefix}{index}@example.com',
+                password=password,
+            )
+            tag_ids, ingredient_ids = seed_recipes(
+                user, recipes=recipes, seed=seed + index)
+            accounts.append(Account(
+                email=user.email,
+                password=password,
+                token=Token.objects.create(user=user).key,
+                recipe_ids=list(Recipe.objects.filter(
+                    user=user).values_list('id', flat=True)),
+                tag_ids=tag_ids,
+                ingredient_ids=ingredient_ids,
+            ))
+
+        return accounts
+
+    def write_report(self, path, report):
+        """Write the report as JSON to the path"""
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        if options['users'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--users and --concurrency must be positive.')
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs --baseline.')
+        baseline = None
+        if options['baseline'] and not options['save_baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)
+
+        # server가 같은 database를 조회하므로 commit 후 마지막에 삭제함
+        prefix = f'load-{uuid.uuid4().hex}-'
+        try:
+            accounts = self.create_accounts(
+                prefix, options['users'], options['recipes'], options['seed'])
+            generator = LoadGenerator(
+                options['url'],
+                accounts,
+                options['mix'],
+                options['concurrency'],
+                sample_images(16, options['seed']),
+                seed=options['seed'],
+            )
+            # worker의 cache와 connection을 채운 뒤 측정함
+            if options['warm_up']:
+                generator.run(duration=options['warm_up'])
+            if options['requests']:
+                samples, elapsed = generator.run(
+                    requests=options['requests'])
+            else:
+                samples, elapsed = generator.run(
+                    duration=options['duration'])
+        finally:
+            get_user_model().objects.filter(
+                email__startswith=prefix).delete()
+        if not samples:
+            raise CommandError('No request was sent.')
+
+        report = summarize(
+            samples,
+            elapsed,
+            url=options['url'],
+            mix=options['mix'],
+            concurrency=options['concurrency'],
+            users=options['users'],
+            recipes=options['recipes'],
+        )
+        self.stdout.write(json.dumps(report, indent=2))
+        if options['output']:
+            self.write_report(options['output'], report)
+        if options['save_baseline']:
+            self.write_report(options['baseline'], report)
+            return
+        if baseline is None:
+            return
+
+        if baseline['config'] != report['config']:
+            self.stderr.write(
+                'The baseline was measured with a different config: '
+                f"{baseline['config']}")
+        regressions = compare(report, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError(
+                'Slower than the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regression'))
@@ -1,25 +1,141 @@
 """
 Djnago command to wait for the database to be available.
 """
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import (
+    DatabaseError,
+    connections,
+)
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+WARM_UP_CACHE_KEY = 'wait-for-db:warm-up'
 
 
 class Command(BaseCommand):
     """Django command to wait for the database"""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            action='append',
+            dest='databases',
+            help='Database alias to wait for, can be repeated',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait before failing, 0 waits forever',
+        )
+        parser.add_argument('--initial-delay', type=float, default=0.005)
+        parser.add_argument('--max-delay', type=float, default=1.0)
+        parser.add_argument(
+            '--warm-up',
+            action='store_true',
+            help='Read the hot tables and touch the cache once available',
+        )
+
+    def wait_for(self, alias, deadline, initial_delay, max_delay):
+        """Poll the database with exponential backoff until it answers"""
+        delay = initial_delay
+        try:
+            while True:
+                try:
+                    self.check(databases=[alias])
+                    return
+                except (Psycopg2Error, OperationalError):
+                    pass
+                # 여러 container가 같은 순간에 재시도하지 않도록 jitter를 줌
+                wait = random.uniform(delay / 2, delay)
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    raise CommandError(
+                        f"Database '{alias}' is still unavailable.")
+                self.stdout.write(
+                    f"Database '{alias}' unavailable, "
+                    f'waiting {wait * 1000:.0f}ms...'
+                )
+                time.sleep(wait)
+                delay = min(delay * 2, max_delay)
+        finally:
+            # thread에서 열린 connection은 Django가 닫지 않으므로 직접 닫음
+            connections[alias].close()
+
+    def _prewarm(self, alias, tables):
+        """Load the tables into the PostgreSQL buffer cache if possible"""
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm'")
+            if cursor.fetchone() is None:
+                return False
+            for table in tables:
+                # table과 그 index를 함께 읽음
+                cursor.execute(
+                    'SELECT pg_prewarm(oid) FROM pg_class '
+                    'WHERE oid = %s::regclass OR oid IN ('
+                    'SELECT indexrelid FROM pg_index '
+                    'WHERE indrelid = %s::regclass)',
+                    [table, table],
+                )
+
+        return True
+
+    def warm_up(self, alias):
+        """Read the hot tables so the first requests do not wait on disk"""
+        models = list(apps.get_app_config('core').get_models())
+        try:
+            if connections[alias].vendor == 'postgresql' and self._prewarm(
+                    alias, [model._meta.db_table for model in models]):
+                return
+            # pg_prewarm이 없으면 API가 처음 조회하는 page를 읽어 둠
+            for model in models:
+                list(model.objects.using(alias).order_by('-pk').values_list(
+                    'pk', flat=True)[:settings.API_PAGE_SIZE])
+        except DatabaseError as exc:
+            # migrate 전이라 table이 없어도 서버는 시작할 수 있어야 함
+            self.stderr.write(f"Skipped warming up '{alias}': {exc}")
+
     def handle(self, *args, **options):
         """Entrypoint for command"""
         self.stdout.write('Waiting for database to be available')
-        db_up = False
-        while db_up is False:
-            try:
-                self.check(databases=['default'])
-                db_up = True
-            except(Psycopg2Error, OperationalError):
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+        aliases = options['databases'] or ['default']
+        unknown = set(aliases) - set(connections.settings)
+        if unknown:
+            raise CommandError(
+                f"Unknown database aliases: {', '.join(sorted(unknown))}")
+        deadline = None
+        if options['timeout']:
+            deadline = time.monotonic() + options['timeout']
+
+        # 여러 database를 동시에 기다려 가장 늦게 뜨는 database만큼만 기다림
+        with ThreadPoolExecutor(max_workers=len(aliases)) as executor:
+            waits = [
+                executor.submit(
+                    self.wait_for,
+                    alias,
+                    deadline,
+                    options['initial_delay'],
+                    options['max_delay'],
+                )
+                for alias in aliases
+            ]
+            for wait in waits:
+                wait.result()
         self.stdout.write(self.style.SUCCESS('Database is available!'))
+
+        if options['warm_up']:
+            for alias in aliases:
+                self.warm_up(alias)
+            # cache backend의 connection이나 directory를 미리 준비함
+            cache.set(WARM_UP_CACHE_KEY, time.time(), timeout=None)
+            self.stdout.write(self.style.SUCCESS('Warmed up'))
@@ -0,0 +1,137 @@
+"""
+Prometheus metrics of the requests served by the workers
+"""
+import atexit
+import os
+import re
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# mark_process_dead가 지우는 live gauge의 file 이름
+LIVE_GAUGE_FILE_RE = re.compile(r'^gauge_live\w+?_(?P<pid>\d+)\.db$')
+
+# label의 종류가 늘어나지 않도록 그 외의 method는 하나로 묶음
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+REQUESTS = Counter(
+    'app_http_requests_total',
+    'Requests by view and response status',
+    ['method', 'view', 'status'],
+)
+REQUEST_DURATION = Histogram(
+    'app_http_request_duration_seconds',
+    'Time to build the response, including the middleware',
+    ['method', 'view'],
+    buckets=(
+        0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75,
+        1.0, 2.5, 5.0, 10.0,
+    ),
+)
+RESPONSE_SIZE = Histogram(
+    'app_http_response_size_bytes',
+    'Size of the response bodies, streaming responses excluded',
+    ['view'],
+    buckets=(100, 1000, 10000, 100000, 1000000, 10000000),
+)
+DB_QUERIES = Histogram(
+    'app_db_queries_per_request',
+    'SQL queries run by a request',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+DB_DURATION = Histogram(
+    'app_db_query_duration_seconds',
+    'Time a request spent running SQL queries',
+    ['view'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+# 모든 worker가 요청을 처리 중이면 worker 수와 같아짐
+REQUESTS_IN_PROGRESS = Gauge(
+    'app_http_requests_in_progress',
+    'Requests being handled by the workers',
+    multiprocess_mode='livesum',
+)
+
+
+def record_request(method, view, status, duration, size, queries,
+                   query_duration):
+    """Record the metrics of a finished request"""
+    if method not in METHODS:
+        method = 'other'
+    REQUESTS.labels(method, view, status).inc()
+    REQUEST_DURATION.labels(method, view).observe(duration)
+    if size is not None:
+        RESPONSE_SIZE.labels(view).observe(size)
+    DB_QUERIES.labels(view).observe(queries)
+    DB_DURATION.labels(view).observe(query_duration)
+
+
+def collect_metrics():
+    """Return the metrics of every worker in the Prometheus text format"""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return generate_latest(REGISTRY)
+
+    # 각 worker가 자신의 file에만 기록하므로 lock 없이 합산할 수 있음
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return generate_latest(registry)
+
+
+def _process_exists(pid):
+    """Return whether a process with the pid is running"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 다른 user의 process는 signal을 보낼 수 없지만 실행 중임
+        pass
+
+    return True
+
+
+def mark_dead_workers():
+    """Stop summing the live gauges of workers which are not running"""
+    # harakiri 등으로 kill된 worker는 종료 hook을 실행하지 못하므로
+    # 새 worker가 시작할 때 남아 있는 file을 정리함
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    pids = {
+        int(match['pid']) for match in map(
+            LIVE_GAUGE_FILE_RE.match, os.listdir(path))
+        if match
+    }
+    for pid in pids - {os.getpid()}:
+        if not _process_exists(pid):
+            multiprocess.mark_process_dead(pid, path)
+
+
+def mark_worker_dead():
+    """Stop summing the live gauges of the exiting worker"""
+    multiprocess.mark_process_dead(os.getpid())
+
+
+def register_worker():
+    """Remove the live gauges of workers when they exit or are replaced"""
+    # metric directory는 container마다 따로 있으므로 pid로 worker를 구분할 수 있음
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return
+    try:
+        import uwsgi
+        from uwsgidecorators import postfork
+    except ImportError:
+        # uvicorn worker는 spawn된 process에서 app을 import함
+        mark_dead_workers()
+        atexit.register(mark_worker_dead)
+    else:
+        # app은 master에서 load되므로 fork된 worker마다 실행함
+        postfork(mark_dead_workers)
+        uwsgi.atexit = mark_worker_dead
@@ -0,0 +1,94 @@
+"""
+Middleware for app
+"""
+import asyncio
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core.metrics import (
+    REQUESTS_IN_PROGRESS,
+    record_request,
+)
+
+
+class RequestStats:
+    """Time a request and the SQL queries it runs"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """Record the latency, queries, size and status of every request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # async view가 thread에서 실행되지 않도록 async로도 동작함
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def wrap_connections(self, stats):
+        """Count the queries of every database of this thread"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+
+        return stack
+
+    def record(self, request, response, stats):
+        """Record the metrics of the request"""
+        # URL 대신 view 이름을 사용하여 label의 종류를 제한함
+        match = request.resolver_match
+        record_request(
+            method=request.method,
+            view=match.view_name if match else 'unmatched',
+            status=str(response.status_code),
+            duration=time.perf_counter() - stats.started,
+            size=None if response.streaming else len(response.content),
+            queries=stats.queries,
+            query_duration=stats.query_duration,
+        )
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+        stats = RequestStats()
+        with REQUESTS_IN_PROGRESS.track_inprogress():
+            with self.wrap_connections(stats):
+                response = self.get_response(request)
+        self.record(request, response, stats)
+
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        with REQUESTS_IN_PROGRESS.track_inprogress():
+            # connection은 thread마다 다르므로 async ORM이 query를 실행하는
+            # thread에서 wrapper를 설치함
+            stack = await sync_to_async(self.wrap_connections)(stats)
+            with stack:
+                response = await self.get_response(request)
+        self.record(request, response, stats)
+
+        return response
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.13 on 2026-10-17 16:12
+
+from django.db import migrations, models
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Merge tags and ingredients which share a name for the same user"""
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field in (('Tag', 'tags'), ('Ingredient', 'ingredients')):
+        model = apps.get_model('core', model_name)
+        through = getattr(Recipe, field).through
+        object_field = f'{model_name.lower()}_id'
+        duplicates = model.objects.values('user_id', 'name').annotate(
+            keep_id=models.Min('id'),
+            total=models.Count('id'),
+        ).filter(total__gt=1)
+        for duplicate in duplicates:
+            # 가장 먼저 만들어진 객체만 남기고 recipe 연결을 옮김
+            others = model.objects.filter(
+                user_id=duplicate['user_id'],
+                name=duplicate['name'],
+            ).exclude(id=duplicate['keep_id'])
+            linked = through.objects.filter(
+                **{object_field: duplicate['keep_id']},
+            ).values('recipe_id')
+            rows = through.objects.filter(**{f'{object_field}__in': others})
+            rows.filter(recipe_id__in=linked).delete()
+            for row in rows.order_by('id'):
+                if not through.objects.filter(
+                    recipe_id=row.recipe_id,
+                    **{object_field: duplicate['keep_id']},
+                ).exists():
+                    setattr(row, object_field, duplicate['keep_id'])
+                    row.save()
+                else:
+                    row.delete()
+            others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_names,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 4.1.13 on 2026-10-17 16:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# recipe가 바뀌거나 tag/ingredient 연결, 이름이 바뀔 때 search_vector를 다시 계산함
+# bulk_create, queryset.update()처럼 signal을 거치지 않는 쓰기도 반영되도록
+# application이 아닌 DB trigger로 관리함
+CREATE_TRIGGERS = """
+CREATE FUNCTION core_recipe_search_document(rid bigint, title text, description text)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(t.name, ' ')
+            FROM core_tag t
+            JOIN core_recipe_tags rt ON rt.tag_id = t.id
+            WHERE rt.recipe_id = rid
+        ), '')), 'B')
+        || setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(i.name, ' ')
+            FROM core_ingredient i
+            JOIN core_recipe_ingredients ri ON ri.ingredient_id = i.id
+            WHERE ri.recipe_id = rid
+        ), '')), 'B')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+$$ LANGUAGE sql STABLE;
+
+CREATE FUNCTION core_recipe_search_vector_row() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := core_recipe_search_document(
+        NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_search_vector
+BEFORE INSERT OR UPDATE OF title, description ON core_recipe
+FOR EACH ROW EXECUTE FUNCTION core_recipe_search_vector_row();
+
+CREATE FUNCTION core_recipe_search_vector_links() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_recipe r
+    SET search_vector = core_recipe_search_document(r.id, r.title, r.description)
+    WHERE r.id IN (SELECT recipe_id FROM changed_rows);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_tags_search_insert
+AFTER INSERT ON core_recipe_tags REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_search_vector_links();
+CREATE TRIGGER core_recipe_tags_search_delete
+AFTER DELETE ON core_recipe_tags REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_search_vector_links();
+CREATE TRIGGER core_recipe_ingredients_search_insert
+AFTER INSERT ON core_recipe_ingredients REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_search_vector_links();
+CREATE TRIGGER core_recipe_ingredients_search_delete
+AFTER DELETE ON core_recipe_ingredients REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_search_vector_links();
+
+CREATE FUNCTION core_recipe_search_vector_rename() RETURNS trigger AS $$
+BEGIN
+    -- TG_ARGV: through table, through table의 tag/ingredient column
+    EXECUTE format(
+        'UPDATE core_recipe r '
+        'SET search_vector = core_recipe_search_document(r.id, r.title, r.description) '
+        'WHERE r.id IN (SELECT recipe_id FROM %I WHERE %I = $1)',
+        TG_ARGV[0], TG_ARGV[1]
+    ) USING NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_tag_search_rename
+AFTER UPDATE OF name ON core_tag
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+EXECUTE FUNCTION core_recipe_search_vector_rename('core_recipe_tags', 'tag_id');
+CREATE TRIGGER core_ingredient_search_rename
+AFTER UPDATE OF name ON core_ingredient
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+EXECUTE FUNCTION core_recipe_search_vector_rename(
+    'core_recipe_ingredients', 'ingredient_id');
+
+UPDATE core_recipe
+SET search_vector = core_recipe_search_document(id, title, description);
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER core_ingredient_search_rename ON core_ingredient;
+DROP TRIGGER core_tag_search_rename ON core_tag;
+DROP FUNCTION core_recipe_search_vector_rename();
+DROP TRIGGER core_recipe_ingredients_search_delete ON core_recipe_ingredients;
+DROP TRIGGER core_recipe_ingredients_search_insert ON core_recipe_ingredients;
+DROP TRIGGER core_recipe_tags_search_delete ON core_recipe_tags;
+DROP TRIGGER core_recipe_tags_search_insert ON core_recipe_tags;
+DROP FUNCTION core_recipe_search_vector_links();
+DROP TRIGGER core_recipe_search_vector ON core_recipe;
+DROP FUNCTION core_recipe_search_vector_row();
+DROP FUNCTION core_recipe_search_document(bigint, text, text);
+"""
+
+
+def create_triggers(apps, schema_editor):
+    """Maintain the recipe search vector with triggers on PostgreSQL"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGGERS, params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    """Remove the recipe search vector triggers"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGERS, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_per_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -7,6 +7,8 @@ import uuid
 import os
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -14,6 +16,8 @@ from django.contrib.auth.models import (
     PermissionsMixin,
 )
 
+from core.storage import ContentAddressedStorage
+
 def recipe_image_file_path(instance, filename):
     """Generate file path for new recipe image"""
     ext = os.path.splitext(filename)[1]
@@ -74,7 +78,24 @@ class Recipe(models.Model):
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField('Tag')
     ingredients = models.ManyToManyField('Ingredient')
-    image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    # 같은 image는 digest 이름의 file 하나를 공유함 (GC에서 image로 참조를 조회함)
+    image = models.ImageField(
+        null=True,
+        upload_to=recipe_image_file_path,
+        storage=ContentAddressedStorage(),
+        db_index=True,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    # title/description/tag/ingredient 이름으로 만든 full-text search용 column
+    # PostgreSQL trigger가 갱신하며 다른 DB에서는 비어 있음
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        # user별 최신순 목록을 정렬 없이 index 순서대로 읽기 위한 index
+        indexes = [
+            models.Index(fields=['user', '-id'], name='recipe_user_id_desc'),
+            GinIndex(fields=['search_vector'], name='recipe_search_vector'),
+        ]
 
     def __str__(self):
         return self.title
@@ -87,6 +108,14 @@ class Tag(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_tag_user_name',
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -99,5 +128,13 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_ingredient_user_name',
+            ),
+        ]
+
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+OpenAPI schema generated once per code version
+"""
+import functools
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import drf_spectacular
+import rest_framework
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from drf_spectacular.renderers import (
+    OpenApiJsonRenderer,
+    OpenApiYamlRenderer,
+)
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import (
+    SCHEMA_KWARGS,
+    SpectacularAPIView,
+)
+
+logger = logging.getLogger(__name__)
+
+# format별 renderer
+SCHEMA_RENDERERS = {
+    'yaml': OpenApiYamlRenderer,
+    'json': OpenApiJsonRenderer,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Return a version which changes whenever the schema may change"""
+    # 배포할 때 APP_VERSION(예: git commit)을 지정하면 그대로 사용하고,
+    # 없으면 source와 schema를 만드는 library의 version으로 계산함
+    if settings.APP_VERSION:
+        return settings.APP_VERSION
+
+    digest = hashlib.sha256(
+        f'{rest_framework.VERSION}:{drf_spectacular.__version__}'.encode())
+    for path in sorted(Path(settings.BASE_DIR).rglob('*.py')):
+        if 'tests' in path.parts:
+            continue
+        digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()[:16]
+
+
+def schema_path(fmt):
+    """Return the path of the schema file under STATIC_ROOT"""
+    return os.path.join(
+        settings.STATIC_ROOT, 'schema', f'{code_version()}.{fmt}')
+
+
+def generate_schema(fmt):
+    """Render the OpenAPI schema of every endpoint in the given format"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+
+    return SCHEMA_RENDERERS[fmt]().render(schema, renderer_context={})
+
+
+def write_schema(fmt, content):
+    """Write the schema file atomically"""
+    path = schema_path(fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    return path
+
+
+class SchemaCache:
+    """In-process cache of the rendered schema and its ETag"""
+
+    def __init__(self):
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def load(self, fmt, generate=True):
+        """Return (content, etag) from memory, the schema file or generation"""
+        key = (code_version(), fmt)
+        entry = self._schemas.get(key)
+        if entry is not None:
+            return entry
+
+        # 여러 thread가 동시에 schema를 만들지 않도록 함
+        with self._lock:
+            entry = self._schemas.get(key)
+            if entry is not None:
+                return entry
+            try:
+                with open(schema_path(fmt), 'rb') as file:
+                    content = file.read()
+            except FileNotFoundError:
+                if not generate:
+                    return None
+                content = generate_schema(fmt)
+                try:
+                    write_schema(fmt, content)
+                except OSError:
+                    logger.warning(
+                        'Could not write the schema file', exc_info=True)
+            entry = self._schemas[key] = (
+                content,
+                quote_etag(hashlib.sha256(content).hexdigest()),
+            )
+
+            return entry
+
+    def clear(self):
+        """Remove every schema from memory"""
+        with self._lock:
+            self._schemas.clear()
+
+
+schema_cache = SchemaCache()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """Serve the schema from memory or STATIC_ROOT with an ETag"""
+    # 요청마다 모든 viewset과 serializer를 introspect하지 않음
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        """Return the schema, or 304 if the client has it"""
+        renderer = request.accepted_renderer
+        content, etag = schema_cache.load(renderer.format)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Disposition'] = (
+                f'inline; filename="{self._get_filename(request, None)}"')
+        response['ETag'] = etag
+        # docs page가 열릴 때마다 ETag로 변경 여부만 확인함
+        response['Cache-Control'] = 'no-cache'
+
+        return response
@@ -0,0 +1,74 @@
+"""
+Helpers for seeding realistic recipe data for benchmarks
+"""
+import random
+from decimal import Decimal
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+
+WORDS = [
+    'Spicy', 'Sweet', 'Roasted', 'Grilled', 'Creamy', 'Crispy', 'Smoky',
+    'Garlic', 'Lemon', 'Chicken', 'Beef', 'Tofu', 'Mushroom', 'Tomato',
+    'Noodle', 'Rice', 'Curry', 'Soup', 'Salad', 'Stew', 'Pie', 'Taco',
+]
+
+
+def _name(rng, index):
+    """Return a readable unique name"""
+    return f'{rng.choice(WORDS)} {rng.choice(WORDS)} {index}'
+
+
+def seed_recipes(user, recipes=1000, tags=50, ingredients=200,
+                 tags_per_recipe=3, ingredients_per_recipe=8,
+                 batch_size=5000, seed=0):
+    """Bulk insert recipes with tags and ingredients for the user"""
+    rng = random.Random(seed)
+    Tag.objects.bulk_create(
+        [Tag(user=user, name=_name(rng, i)) for i in range(tags)],
+        batch_size=batch_size,
+    )
+    Ingredient.objects.bulk_create(
+        [
+            Ingredient(user=user, name=_name(rng, i))
+            for i in range(ingredients)
+        ],
+        batch_size=batch_size,
+    )
+    tag_ids = list(
+        Tag.objects.filter(user=user).values_list('id', flat=True))
+    ingredient_ids = list(
+        Ingredient.objects.filter(user=user).values_list('id', flat=True))
+
+    # 1M row도 메모리에 한 번에 올리지 않도록 batch 단위로 insert함
+    for start in range(0, recipes, batch_size):
+        batch = Recipe.objects.bulk_create([
+            Recipe(
+                user=user,
+                title=_name(rng, i),
+                description=' '.join(rng.choices(WORDS, k=12)),
+                time_minutes=rng.randint(5, 180),
+                price=Decimal(rng.randint(100, 9999)) / 100,
+            )
+            for i in range(start, min(start + batch_size, recipes))
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe_id=recipe.id, tag_id=tag_id)
+            for recipe in batch
+            for tag_id in rng.sample(
+                tag_ids, min(tags_per_recipe, len(tag_ids)))
+        ], batch_size=batch_size)
+        Recipe.ingredients.through.objects.bulk_create([
+            Recipe.ingredients.through(
+                recipe_id=recipe.id, ingredient_id=ingredient_id)
+            for recipe in batch
+            for ingredient_id in rng.sample(
+                ingredient_ids,
+                min(ingredients_per_recipe, len(ingredient_ids)),
+            )
+        ], batch_size=batch_size)
+
+    return tag_ids, ingredient_ids
@@ -0,0 +1,29 @@
+"""
+Signal handlers for the core app
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_save,
+    post_delete,
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import (
+    invalidate_token,
+    invalidate_user_tokens,
+)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop authenticating with a deleted token"""
+    invalidate_token(instance.key, instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_changed_user_tokens(sender, instance, **kwargs):
+    """Reload the user of cached tokens when the user changes"""
+    # 비활성화된 user의 token이 cache에서 계속 인증되지 않도록 함
+    invalidate_user_tokens(instance.pk)
@@ -0,0 +1,62 @@
+"""
+Measure the startup of a worker process, run as python -m core.startup_probe
+"""
+# 측정 전에 Django를 import하지 않도록 표준 library만 먼저 import함
+import json
+import os
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+
+def _get(application, path, token):
+    """Return the status and time in ms of a GET request"""
+    environ = {
+        'PATH_INFO': path,
+        'HTTP_HOST': 'localhost',
+        'HTTP_AUTHORIZATION': f'Token {token}',
+    }
+    setup_testing_defaults(environ)
+    statuses = []
+    start = time.perf_counter()
+    response = application(
+        environ, lambda status, headers: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        # request_finished signal로 connection을 정리함
+        response.close()
+
+    return statuses[0], (time.perf_counter() - start) * 1000
+
+
+def main(path, token):
+    """Print the startup timings of this process as JSON"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    timings = {}
+
+    start = time.perf_counter()
+    import django
+    from django.conf import settings
+    settings.INSTALLED_APPS
+    timings['import_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    django.setup(set_prefix=False)
+    timings['setup_ms'] = (time.perf_counter() - start) * 1000
+
+    # app.wsgi가 handler를 만들고 warm-up을 실행함
+    start = time.perf_counter()
+    from app.wsgi import application
+    timings['application_ms'] = (time.perf_counter() - start) * 1000
+
+    status, timings['first_request_ms'] = _get(application, path, token)
+    if not status.startswith('200'):
+        raise SystemExit(f'GET {path} returned {status}')
+    _, timings['second_request_ms'] = _get(application, path, token)
+
+    json.dump(timings, sys.stdout)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,51 @@
+"""
+Content-addressed file storage
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+DIGEST_ATTR = 'sha256'
+
+
+def content_digest(content):
+    """Return the sha256 hex digest of a file"""
+    # upload handler가 streaming 중에 계산한 digest가 있으면 그대로 사용함
+    digest = getattr(content, DIGEST_ATTR, None)
+    if digest is not None:
+        return digest
+
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+
+    return sha256.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage which names files by the digest of their content"""
+    # 같은 내용의 file은 한 번만 저장하고 여러 row가 같은 이름을 참조함
+    # 참조가 없어진 file은 gc_recipe_images command가 삭제함
+
+    def blob_name(self, name, digest):
+        """Return the name of the blob in the directory of the given name"""
+        directory, filename = os.path.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], f'{digest}{ext}')
+
+    def save(self, name, content, max_length=None):
+        """Store the content under its digest unless it is already stored"""
+        if name is None:
+            name = content.name
+        name = self.blob_name(name, content_digest(content))
+        if self.exists(name):
+            # gc가 방금 다시 참조된 blob을 지우지 않도록 mtime을 갱신함
+            os.utime(self.path(name))
+            return name
+
+        # 같은 내용을 동시에 저장하면 Django가 suffix를 붙여 따로 저장함
+        return super().save(name, content, max_length)
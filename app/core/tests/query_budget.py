@@ -0,0 +1,138 @@
+"""
+Query budget and N+1 checks for the API tests
+"""
+import functools
+import inspect
+import re
+from collections import Counter
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+# 같은 모양의 query가 한 요청에서 이 횟수보다 많이 실행되면 N+1로 판단함
+MAX_REPEATS = 2
+
+# transaction 제어 문은 요청마다 반복되므로 N+1 검사에서 제외함
+TRANSACTION_STATEMENTS = (
+    'BEGIN',
+    'COMMIT',
+    'ROLLBACK',
+    'SAVEPOINT',
+    'RELEASE SAVEPOINT',
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r'\?(?:\s*,\s*\?)*')
+_ROWS = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+
+
+def fingerprint(sql):
+    """Return the statement with its literals replaced by placeholders"""
+    # IN (1, 2, 3)과 여러 row의 VALUES도 개수와 관계없이 같은 모양이 됨
+    sql = _LITERALS.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    sql = _ROWS.sub('(?)', sql)
+
+    return ' '.join(sql.split())
+
+
+class QueryRecorder(CaptureQueriesContext):
+    """Capture the queries of a block and find the repeated statements"""
+
+    def __init__(self, using=connection):
+        super().__init__(using)
+
+    def repeated(self, max_repeats=MAX_REPEATS):
+        """Return the fingerprints run more than max_repeats times"""
+        counts = Counter(
+            fingerprint(query['sql']) for query in self.captured_queries
+            if not query['sql'].startswith(TRANSACTION_STATEMENTS)
+        )
+
+        return {
+            sql: count for sql, count in counts.items()
+            if count > max_repeats
+        }
+
+    def problems(self, budget=None, max_repeats=MAX_REPEATS):
+        """Return the messages of the checks the queries fail"""
+        problems = []
+        if budget is not None and len(self) > budget:
+            problems.append(
+                f'{len(self)} queries executed, the budget is {budget}')
+        for sql, count in self.repeated(max_repeats).items():
+            problems.append(f'{count} times (N+1?): {sql}')
+        if problems:
+            problems.append('Captured queries were:')
+            problems.extend(
+                f'{i}. {query["sql"]}'
+                for i, query in enumerate(self.captured_queries, start=1)
+            )
+
+        return problems
+
+
+@contextmanager
+def assert_queries(budget=None, max_repeats=MAX_REPEATS):
+    """Fail if the block runs more than budget or repeated queries"""
+    with QueryRecorder() as recorder:
+        yield recorder
+    problems = recorder.problems(budget, max_repeats)
+    if problems:
+        raise AssertionError('\n'.join(problems))
+
+
+def request_budget(response):
+    """Return the query budget of the view action which responded"""
+    # DRF Response만 응답한 view를 기록함
+    context = getattr(response, 'renderer_context', None) or {}
+    view = context.get('view')
+    budgets = getattr(view, 'query_budgets', {})
+
+    return budgets.get(getattr(view, 'action', None))
+
+
+def _checked_request(request, max_repeats):
+    """Wrap Client.request to check the queries of every request"""
+    @functools.wraps(request)
+    def wrapper(client, **params):
+        with QueryRecorder() as recorder:
+            response = request(client, **params)
+        problems = recorder.problems(request_budget(response), max_repeats)
+        if problems:
+            raise AssertionError('\n'.join([
+                f"{params['REQUEST_METHOD']} {params['PATH_INFO']}:",
+                *problems,
+            ]))
+
+        return response
+
+    return wrapper
+
+
+def check_queries(max_repeats=MAX_REPEATS):
+    """
+    Check the queries of every test client request against the budget of
+    the responding view and for repeated statements.
+    Decorates a test method or every test method of a TestCase.
+    """
+    def decorate(test):
+        if inspect.isclass(test):
+            for name, method in list(vars(test).items()):
+                if name.startswith('test') and callable(method):
+                    setattr(test, name, decorate(method))
+            return test
+
+        # APIClient도 Django Client.request를 통해 요청함
+        patch = mock.patch.object(
+            Client,
+            'request',
+            _checked_request(Client.request, max_repeats),
+        )
+
+        return patch(test)
+
+    return decorate
@@ -0,0 +1,186 @@
+"""
+Tests for the cached token authentication
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import (
+    USER_VERSION_KEY,
+    TokenCache,
+    token_cache,
+    token_cache_key,
+)
+
+ME_URL = reverse('user:me')
+
+
+class TokenCacheTests(SimpleTestCase):
+    """Test the in-process token cache"""
+
+    def test_evicts_least_recently_used(self):
+        """Test the cache keeps at most max_size entries"""
+        token_cache = TokenCache(max_size=2, ttl=60)
+        token_cache.set('a', 1)
+        token_cache.set('b', 2)
+        token_cache.get('a')
+        token_cache.set('c', 3)
+
+        self.assertEqual(token_cache.get('a'), 1)
+        self.assertIsNone(token_cache.get('b'))
+        self.assertEqual(token_cache.get('c'), 3)
+
+    @patch('core.authentication.time.monotonic')
+    def test_entries_expire(self, patched_monotonic):
+        """Test entries are dropped after the TTL"""
+        token_cache = TokenCache(max_size=2, ttl=60)
+        patched_monotonic.return_value = 100
+        token_cache.set('a', 1)
+
+        patched_monotonic.return_value = 159
+        self.assertEqual(token_cache.get('a'), 1)
+        patched_monotonic.return_value = 161
+        self.assertIsNone(token_cache.get('a'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating API requests with cached tokens"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_warm_request_skips_auth_query(self):
+        """Test a repeated request does not look up the token again"""
+        self.client.get(ME_URL)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating"""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user stops authenticating"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_updated_user_reloaded(self):
+        """Test changes to the user are visible on the next request"""
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {'name': 'Updated name'})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Updated name')
+
+    @override_settings(AUTH_TOKEN_CACHE={
+        'MAX_SIZE': 100, 'TTL': 60, 'USE_DJANGO_CACHE': True,
+    })
+    def test_shared_cache_used_by_cold_worker(self):
+        """Test a token cached by another worker skips the auth query"""
+        self.client.get(ME_URL)
+        token_cache.clear()
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE={
+        'MAX_SIZE': 100, 'TTL': 60, 'USE_DJANGO_CACHE': True,
+    })
+    def test_shared_cache_user_change(self):
+        """Test changing the user invalidates the tokens of other workers"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        # 다른 worker는 shared cache만 가지고 있음
+        token_cache.clear()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE={
+        'MAX_SIZE': 100, 'TTL': 60, 'USE_DJANGO_CACHE': True,
+    })
+    def test_shared_cache_invalidates_local_hits(self):
+        """Test changes in another worker invalidate the local cache"""
+        other_token = Token.objects.create(
+            user=get_user_model().objects.create_user(
+                email='other@example.com', password='testpass123'),
+        )
+        other_client = APIClient()
+        other_client.credentials(
+            HTTP_AUTHORIZATION=f'Token {other_token.key}')
+        self.client.get(ME_URL)
+        other_client.get(ME_URL)
+
+        # 다른 worker에서 처리되어 이 worker의 local cache는 지워지지 않음
+        with patch.object(token_cache, 'delete'), \
+                patch.object(token_cache, 'delete_user'):
+            other_token.delete()
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertEqual(
+            other_client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    @override_settings(AUTH_TOKEN_CACHE={
+        'MAX_SIZE': 100, 'TTL': 60, 'USE_DJANGO_CACHE': True,
+    })
+    def test_shared_cache_keys_hide_token(self):
+        """Test the token can not be read from keys derived from the user"""
+        self.client.get(ME_URL)
+
+        self.assertIsNotNone(cache.get(token_cache_key(self.token.key)))
+        self.assertIsNone(cache.get(f'auth-token:{self.token.key}'))
+        self.assertNotEqual(
+            cache.get(USER_VERSION_KEY.format(user_id=self.user.pk)),
+            self.token.key,
+        )
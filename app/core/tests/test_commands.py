@@ -2,10 +2,26 @@
 Test custom Django management commands.
 """
 from unittest.mock import patch
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
 from psycopg2 import OperationalError as Psycopg2Error
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.cache import cache
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+
+from core.models import Recipe
+from recipe.images import variant_dir
 
 """
 check : Command의 상태를 검사하는 메소드로,
@@ -57,3 +73,120 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+    @patch('time.sleep')
+    def test_wait_for_db_backoff(self, patched_sleep, patched_check):
+        """Test the delay starts in milliseconds and doubles up to the max"""
+        patched_check.side_effect = [OperationalError] * 10 + [True]
+
+        call_command(
+            'wait_for_db', initial_delay=0.005, max_delay=0.04,
+            stdout=StringIO())
+
+        delays = [c.args[0] for c in patched_sleep.call_args_list]
+        self.assertEqual(len(delays), 10)
+        self.assertTrue(0.0025 <= delays[0] <= 0.005)
+        self.assertTrue(all(0.02 <= d <= 0.04 for d in delays[3:]))
+
+    @patch('time.sleep')
+    def test_wait_for_db_timeout(self, patched_sleep, patched_check):
+        """Test the command fails once the timeout has passed"""
+        patched_check.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0.001, stdout=StringIO())
+
+    @patch('core.management.commands.wait_for_db.connections')
+    def test_wait_for_several_databases(self, patched_connections,
+                                        patched_check):
+        """Test every given database alias is checked"""
+        patched_connections.settings = {'default': {}, 'replica': {}}
+        patched_check.return_value = True
+
+        call_command(
+            'wait_for_db', databases=['default', 'replica'],
+            stdout=StringIO())
+
+        checked = sorted(c.kwargs['databases'][0]
+                         for c in patched_check.call_args_list)
+        self.assertEqual(checked, ['default', 'replica'])
+
+    def test_wait_for_unknown_database(self, patched_check):
+        """Test an unknown database alias is rejected"""
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', databases=['missing'])
+
+        patched_check.assert_not_called()
+
+
+@patch('core.management.commands.wait_for_db.Command.check')
+class WaitForDbWarmUpTests(TestCase):
+    """Test warming up the database and the cache"""
+
+    def test_warm_up(self, patched_check):
+        """Test warm-up reads the tables and touches the cache"""
+        cache.delete('wait-for-db:warm-up')
+        out = StringIO()
+
+        call_command('wait_for_db', warm_up=True, stdout=out)
+
+        self.assertIn('Warmed up', out.getvalue())
+        self.assertIsNotNone(cache.get('wait-for-db:warm-up'))
+
+
+class GarbageCollectImagesTests(TestCase):
+    """Test deleting recipe images which are no longer referenced"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'password123')
+        self.recipe = Recipe.objects.create(
+            user=user,
+            title='Sample recipe',
+            time_minutes=5,
+            price=Decimal('5.00'),
+        )
+        self.storage = Recipe._meta.get_field('image').storage
+
+    def _store(self, content, age=0):
+        """Store an image which was written age seconds ago"""
+        name = self.storage.save(
+            'uploads/recipe/image.jpg', ContentFile(content))
+        if age:
+            mtime = os.path.getmtime(self.storage.path(name)) - age
+            os.utime(self.storage.path(name), (mtime, mtime))
+
+        return name
+
+    def test_unreferenced_images_deleted(self):
+        """Test only old images without a recipe are deleted"""
+        referenced = self._store(b'referenced', age=7200)
+        self.recipe.image = referenced
+        self.recipe.save()
+        unreferenced = self._store(b'unreferenced', age=7200)
+        os.makedirs(self.storage.path(variant_dir(unreferenced)))
+        recent = self._store(b'recent')
+
+        out = StringIO()
+        call_command('gc_recipe_images', batch_size=1, stdout=out)
+
+        self.assertTrue(self.storage.exists(referenced))
+        self.assertTrue(self.storage.exists(recent))
+        self.assertFalse(self.storage.exists(unreferenced))
+        self.assertFalse(self.storage.exists(variant_dir(unreferenced)))
+        self.assertIn('Deleted 1 images, kept 2', out.getvalue())
+
+    def test_dry_run_keeps_images(self):
+        """Test a dry run does not delete anything"""
+        name = self._store(b'unreferenced', age=7200)
+
+        out = StringIO()
+        call_command('gc_recipe_images', dry_run=True, stdout=out)
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertIn('Would delete 1 images', out.getvalue())
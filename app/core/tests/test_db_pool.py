@@ -0,0 +1,155 @@
+"""
+Tests for the database connection pool
+"""
+import threading
+from unittest.mock import (
+    Mock,
+    patch,
+)
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import db_pool
+from core.db_pool import (
+    ConnectionPool,
+    PoolTimeout,
+)
+
+
+def create_pool(**params):
+    """Create and return a pool of mock connections"""
+    defaults = {
+        'connect': Mock(side_effect=lambda: Mock()),
+        'is_usable': Mock(return_value=True),
+        'max_size': 2,
+        'timeout': 1,
+    }
+    defaults.update(params)
+
+    return ConnectionPool(**defaults)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test checking connections out of the pool"""
+
+    def test_released_connection_reused(self):
+        """Test a released connection is reused without connecting"""
+        pool = create_pool()
+
+        conn = pool.acquire()
+        pool.release(conn)
+
+        self.assertIs(pool.acquire(), conn)
+        self.assertEqual(pool.connect.call_count, 1)
+        self.assertEqual(pool.stats()['checkouts'], 2)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_waits_for_released_connection(self):
+        """Test a full pool waits until a connection is released"""
+        pool = create_pool(max_size=1)
+        conn = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, [conn])
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        self.assertIs(pool.acquire(), conn)
+        stats = pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['wait_seconds'], 0)
+        self.assertEqual(stats['size'], 1)
+
+    def test_timeout_when_full(self):
+        """Test a full pool raises after the timeout"""
+        pool = create_pool(max_size=1, timeout=0.01)
+        pool.acquire()
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_unusable_idle_connection_discarded(self):
+        """Test a broken idle connection is replaced by a new one"""
+        pool = create_pool(check_after=0)
+        pool.is_usable.return_value = False
+        broken = pool.acquire()
+        pool.release(broken)
+
+        conn = pool.acquire()
+
+        self.assertIsNot(conn, broken)
+        broken.close.assert_called_once()
+        self.assertEqual(pool.stats()['discarded'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_health_check_skipped_for_recent_connection(self):
+        """Test recently used connections are not checked"""
+        pool = create_pool(check_after=60)
+        pool.release(pool.acquire())
+
+        pool.acquire()
+
+        pool.is_usable.assert_not_called()
+
+    def test_failed_connect_frees_slot(self):
+        """Test a failed connection attempt does not use up the pool"""
+        pool = create_pool(max_size=1, connect=Mock(side_effect=OSError))
+
+        with self.assertRaises(OSError):
+            pool.acquire()
+
+        self.assertEqual(pool.stats()['size'], 0)
+
+    @patch('core.db_pool._pools', new_callable=dict)
+    def test_new_pool_after_fork(self, pools):
+        """Test a forked worker does not reuse the parent's pool"""
+        parent = db_pool.get_pool('default', Mock(), Mock())
+
+        with patch('core.db_pool.os.getpid', return_value=-1):
+            child = db_pool.get_pool('default', Mock(), Mock())
+            again = db_pool.get_pool('default', Mock(), Mock())
+
+        self.assertIsNot(parent, child)
+        self.assertIs(child, again)
+
+
+class DbPoolApiTests(TestCase):
+    """Test the pool stats API"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @patch('core.views.pool_stats')
+    def test_stats_for_admin(self, mock_stats):
+        """Test admins can read the pool stats"""
+        mock_stats.return_value = {'default': {'in_use': 1}}
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(reverse('db-pool'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'default': {'in_use': 1}})
+
+    def test_stats_forbidden_for_users(self):
+        """Test other users cannot read the pool stats"""
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(reverse('db-pool'))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,143 @@
+"""
+Tests for the load test harness
+"""
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import (
+    LiveServerTestCase,
+    SimpleTestCase,
+    override_settings,
+)
+
+from core.loadtest import (
+    compare,
+    parse_mix,
+    summarize,
+)
+
+
+def report(slowest_ms, rps=100, errors=0):
+    """Return a report of 100 requests whose slowest 2 take slowest_ms"""
+    samples = [('recipes', 10, 200)] * 98
+    samples += [('recipes', slowest_ms, 200)] * (2 - errors)
+    samples += [('recipes', slowest_ms, 500)] * errors
+
+    return summarize(samples, len(samples) / rps)
+
+
+class LoadTestReportTests(SimpleTestCase):
+    """Test the report and the comparison with a baseline"""
+
+    def test_parse_mix(self):
+        """Test the weights of the requests are parsed"""
+        self.assertEqual(
+            parse_mix('recipes=3, token=1,upload=0'),
+            {'recipes': 3, 'token': 1, 'upload': 0},
+        )
+        for value in ('unknown=1', 'recipes=x', 'recipes=-1', 'tags=0'):
+            with self.assertRaises(ValueError):
+                parse_mix(value)
+
+    def test_summarize(self):
+        """Test the percentiles, throughput and errors of each request"""
+        samples = [('tags', ms, 200) for ms in range(1, 101)]
+        samples.append(('token', 500, 400))
+
+        result = summarize(samples, 2, concurrency=1)
+
+        self.assertEqual(result['config'], {'concurrency': 1})
+        self.assertEqual(result['total']['requests'], 101)
+        self.assertEqual(result['total']['errors'], 1)
+        tags = result['endpoints']['tags']
+        self.assertEqual(tags['rps'], 50)
+        self.assertEqual(tags['p50_ms'], 50.5)
+        self.assertEqual(tags['p99_ms'], 99.01)
+        self.assertEqual(result['endpoints']['token']['p99_ms'], 500)
+
+    def test_compare(self):
+        """Test only the changes over the tolerance are regressions"""
+        baseline = report(slowest_ms=100)
+
+        self.assertEqual(compare(report(slowest_ms=105), baseline), [])
+        self.assertIn(
+            'recipes p99_ms: 150.0 > 100.0',
+            compare(report(slowest_ms=150), baseline),
+        )
+        self.assertIn(
+            'total rps: 50.0 < 100.0',
+            compare(report(slowest_ms=100, rps=50), baseline),
+        )
+        self.assertIn(
+            'recipes error_rate: 0.01 > 0.0',
+            compare(report(slowest_ms=100, errors=1), baseline),
+        )
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    """Test the load test against a live server"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=self.media_root,
+            RECIPE_IMAGE_VARIANTS={
+                'WORKERS': 0,
+                'QUALITY': 80,
+                'SIZES': {'thumbnail': 4},
+            },
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def load_test(self, *args, **options):
+        """Run the command and return its report"""
+        output = os.path.join(self.media_root, 'report.json')
+        call_command(
+            'load_test',
+            *args,
+            url=self.live_server_url,
+            concurrency=1,
+            requests=20,
+            warm_up=0,
+            users=1,
+            recipes=10,
+            output=output,
+            stdout=StringIO(),
+            stderr=StringIO(),
+            **options,
+        )
+        with open(output) as file:
+            return json.load(file)
+
+    def test_load_test(self):
+        """Test every request of the mix succeeds and the data is removed"""
+        result = self.load_test()
+
+        self.assertEqual(result['total']['requests'], 20)
+        self.assertEqual(result['total']['errors'], 0)
+        self.assertEqual(
+            set(result['endpoints']),
+            {'recipes', 'tags', 'ingredients', 'token', 'upload'},
+        )
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_baseline(self):
+        """Test a run is compared against the saved baseline"""
+        path = os.path.join(self.media_root, 'baseline.json')
+        self.load_test('--mix=tags=1', baseline=path, save_baseline=True)
+        with open(path) as file:
+            baseline = json.load(file)
+        baseline['total']['p99_ms'] = 0
+        with open(path, 'w') as file:
+            json.dump(baseline, file)
+
+        with self.assertRaisesRegex(CommandError, 'total p99_ms'):
+            self.load_test('--mix=tags=1', baseline=path)
@@ -0,0 +1,204 @@
+"""
+Tests for the request metrics
+"""
+from unittest.mock import patch
+import os
+import subprocess
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.metrics import mark_dead_workers
+from core.models import Recipe
+
+METRICS_URL = reverse('metrics')
+HEALTH_CHECK_URL = reverse('health-check')
+RECIPES_URL = reverse('recipe:recipe-list')
+ASYNC_RECIPES_URL = reverse('recipe-async:recipe-list')
+
+
+def sample(name, **labels):
+    """Return the current value of a metric sample"""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsMiddlewareTests(TestCase):
+    """Test the metrics recorded for each request"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+
+    def test_request_recorded(self):
+        """Test the status, latency and size are recorded by view"""
+        labels = {'method': 'GET', 'view': 'health-check'}
+        requests = sample(
+            'app_http_requests_total', status='200', **labels)
+        observed = sample('app_http_request_duration_seconds_count', **labels)
+        size = sample(
+            'app_http_response_size_bytes_sum', view='health-check')
+
+        res = self.client.get(HEALTH_CHECK_URL)
+
+        self.assertEqual(
+            sample('app_http_requests_total', status='200', **labels),
+            requests + 1,
+        )
+        self.assertEqual(
+            sample('app_http_request_duration_seconds_count', **labels),
+            observed + 1,
+        )
+        self.assertEqual(
+            sample('app_http_response_size_bytes_sum', view='health-check'),
+            size + len(res.content),
+        )
+
+    def test_queries_recorded(self):
+        """Test the SQL queries of a request are counted"""
+        self.client.force_authenticate(self.user)
+        Recipe.objects.create(
+            user=self.user, title='Sample', time_minutes=5, price='1.00')
+        view = 'recipe:recipe-list'
+        queries = sample('app_db_queries_per_request_sum', view=view)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            sample('app_db_queries_per_request_sum', view=view),
+            queries + len(context.captured_queries),
+        )
+        self.assertGreater(
+            sample('app_db_query_duration_seconds_count', view=view), 0)
+
+    def test_unmatched_request(self):
+        """Test requests without a view share one label"""
+        labels = {'method': 'GET', 'view': 'unmatched', 'status': '404'}
+        requests = sample('app_http_requests_total', **labels)
+
+        self.client.get('/api/unknown/')
+        self.client.get('/api/unknown/other/')
+
+        self.assertEqual(
+            sample('app_http_requests_total', **labels), requests + 2)
+
+    def test_unknown_method(self):
+        """Test unknown methods share one label"""
+        labels = {'method': 'other', 'view': 'health-check', 'status': '405'}
+        requests = sample('app_http_requests_total', **labels)
+
+        self.client.generic('PURGE', HEALTH_CHECK_URL)
+
+        self.assertEqual(
+            sample('app_http_requests_total', **labels), requests + 1)
+
+    async def test_async_request_recorded(self):
+        """Test requests to the async views are recorded"""
+        token = await Token.objects.acreate(user=self.user)
+        labels = {'method': 'GET', 'view': 'recipe-async:recipe-list'}
+        requests = sample('app_http_requests_total', status='200', **labels)
+        queries = sample(
+            'app_db_queries_per_request_sum', view=labels['view'])
+
+        await self.async_client.get(
+            ASYNC_RECIPES_URL, AUTHORIZATION=f'Token {token.key}')
+
+        self.assertEqual(
+            sample('app_http_requests_total', status='200', **labels),
+            requests + 1,
+        )
+        self.assertGreater(
+            sample('app_db_queries_per_request_sum', view=labels['view']),
+            queries,
+        )
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        """Test nothing is recorded when the metrics are disabled"""
+        labels = {'method': 'GET', 'view': 'health-check', 'status': '200'}
+        requests = sample('app_http_requests_total', **labels)
+
+        self.client.get(HEALTH_CHECK_URL)
+
+        self.assertEqual(sample('app_http_requests_total', **labels), requests)
+
+
+class MetricsApiTests(TestCase):
+    """Test the metrics endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test the metrics need an admin user"""
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics(self):
+        """Test the metrics are returned in the Prometheus text format"""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123',
+        )
+        token = Token.objects.create(user=admin)
+        self.client.get(HEALTH_CHECK_URL)
+
+        res = self.client.get(
+            METRICS_URL,
+            HTTP_AUTHORIZATION=f'Token {token.key}',
+            HTTP_ACCEPT='text/plain;version=0.0.4;q=0.5,*/*;q=0.1',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            b'app_http_requests_total{method="GET",status="200",'
+            b'view="health-check"}',
+            res.content,
+        )
+
+
+class WorkerMetricsTests(SimpleTestCase):
+    """Test the live gauges of exited workers are removed"""
+
+    def test_mark_dead_workers(self):
+        """Test only the live gauges of processes not running are removed"""
+        # 종료된 process의 pid를 얻음
+        proc = subprocess.Popen(['true'])
+        proc.wait()
+        names = [
+            f'gauge_livesum_{proc.pid}.db',
+            f'counter_{proc.pid}.db',
+            f'gauge_livesum_{os.getpid()}.db',
+        ]
+        with tempfile.TemporaryDirectory() as path:
+            for name in names:
+                open(os.path.join(path, name), 'w').close()
+
+            with patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': path}):
+                mark_dead_workers()
+
+            self.assertEqual(sorted(os.listdir(path)), sorted(names[1:]))
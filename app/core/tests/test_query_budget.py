@@ -0,0 +1,122 @@
+"""
+Tests for the query budget checks
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import Tag
+from core.tests.query_budget import (
+    QueryRecorder,
+    assert_queries,
+    check_queries,
+    fingerprint,
+)
+from recipe.views import TagViewSet
+
+TAGS_URL = reverse('recipe:tag-list')
+
+
+class FingerprintTests(SimpleTestCase):
+    """Test statements are grouped regardless of their values"""
+
+    def test_literals_replaced(self):
+        """Test strings and numbers are replaced by placeholders"""
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM \"core_tag\" WHERE \"user_id\" = 12 "
+                "AND \"name\" = 'it''s'  LIMIT 21"),
+            'SELECT * FROM "core_tag" WHERE "user_id" = ? '
+            'AND "name" = ? LIMIT ?',
+        )
+
+    def test_lists_collapsed(self):
+        """Test IN lists and VALUES rows of any length look the same"""
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (1, 2, 3)'),
+            fingerprint('SELECT 1 FROM t WHERE id IN (4)'),
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')"),
+            fingerprint("INSERT INTO t (a, b) VALUES (3, 'z')"),
+        )
+
+    def test_identifiers_kept(self):
+        """Test numbers in identifiers are not replaced"""
+        self.assertEqual(
+            fingerprint('SELECT U0."id" FROM "t2" U0'),
+            'SELECT U0."id" FROM "t2" U0',
+        )
+
+
+class QueryBudgetTests(TestCase):
+    """Test queries are checked against budgets and for N+1 patterns"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(3)
+        ]
+
+    def test_repeated_queries(self):
+        """Test a statement run once per object is reported"""
+        with QueryRecorder() as recorder:
+            for tag in self.tags:
+                Tag.objects.get(id=tag.id)
+
+        self.assertEqual(
+            list(recorder.repeated().values()), [len(self.tags)])
+        self.assertEqual(recorder.repeated(max_repeats=3), {})
+
+    def test_assert_queries_budget(self):
+        """Test a block over its budget fails"""
+        with self.assertRaisesRegex(AssertionError, 'the budget is 1'):
+            with assert_queries(budget=1):
+                list(Tag.objects.all())
+                list(Tag.objects.all())
+
+    def test_assert_queries_n_plus_one(self):
+        """Test a block with an N+1 pattern fails"""
+        with self.assertRaisesRegex(AssertionError, r'3 times \(N\+1\?\)'):
+            with assert_queries():
+                for tag in self.tags:
+                    Tag.objects.get(id=tag.id)
+
+    def test_check_queries_budget(self):
+        """Test a request over the budget of its view action fails"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        @check_queries()
+        def request():
+            return client.get(TAGS_URL)
+
+        with patch.dict(TagViewSet.query_budgets, {'list': 0}):
+            with self.assertRaisesRegex(
+                    AssertionError, f'GET {TAGS_URL}:\n1 queries executed'):
+                request()
+        request()
+
+    def test_check_queries_class(self):
+        """Test every test method of a class is checked"""
+        @check_queries()
+        class Tests(TestCase):
+            def test_request(self):
+                pass
+
+            def helper(self):
+                pass
+
+        self.assertTrue(hasattr(Tests.test_request, 'patchings'))
+        self.assertFalse(hasattr(Tests.helper, 'patchings'))
@@ -0,0 +1,115 @@
+"""
+Tests for the cached OpenAPI schema
+"""
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import schema
+from core.schema import (
+    schema_cache,
+    schema_path,
+)
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class CachedSchemaTests(TestCase):
+    """Test serving the schema generated once per code version"""
+
+    def setUp(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        settings = override_settings(STATIC_ROOT=static_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        schema_cache.clear()
+        self.addCleanup(schema_cache.clear)
+        self.client = APIClient()
+
+    def test_schema_served_with_etag(self):
+        """Test the schema is generated, written and served with an ETag"""
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(b'/api/recipe/recipes/', res.content)
+        self.assertTrue(res['ETag'])
+        with open(schema_path('yaml'), 'rb') as file:
+            self.assertEqual(file.read(), res.content)
+
+    def test_not_modified(self):
+        """Test a client with the current schema gets 304"""
+        etag = self.client.get(SCHEMA_URL)['ETag']
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_json_schema(self):
+        """Test the JSON format is served with its own ETag"""
+        yaml_res = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('/api/recipe/recipes/', json.loads(res.content)['paths'])
+        self.assertNotEqual(res['ETag'], yaml_res['ETag'])
+
+    @patch('core.schema.generate_schema', wraps=schema.generate_schema)
+    def test_generated_once(self, patched_generate):
+        """Test repeated requests do not introspect the views again"""
+        self.client.get(SCHEMA_URL)
+        self.client.get(SCHEMA_URL)
+
+        patched_generate.assert_called_once_with('yaml')
+
+    def test_served_from_file(self):
+        """Test a schema file built for this version is served as is"""
+        os.makedirs(os.path.dirname(schema_path('yaml')))
+        with open(schema_path('yaml'), 'wb') as file:
+            file.write(b'openapi: 3.0.3\n')
+
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.content, b'openapi: 3.0.3\n')
+
+    def test_regenerated_for_new_version(self):
+        """Test a new code version gets a new schema file"""
+        self.client.get(SCHEMA_URL)
+
+        with patch('core.schema.code_version', return_value='next'):
+            self.client.get(SCHEMA_URL)
+            path = schema_path('yaml')
+
+        self.assertTrue(os.path.exists(path))
+        self.assertNotEqual(path, schema_path('yaml'))
+
+    @override_settings(APP_VERSION='abc123')
+    def test_build_schema(self):
+        """Test the command writes both formats and removes old versions"""
+        schema.code_version.cache_clear()
+        self.addCleanup(schema.code_version.cache_clear)
+        os.makedirs(os.path.dirname(schema_path('yaml')))
+        old = os.path.join(os.path.dirname(schema_path('yaml')), 'old.yaml')
+        open(old, 'wb').close()
+
+        call_command('build_schema', stdout=StringIO())
+
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(old))),
+            ['abc123.json', 'abc123.yaml'],
+        )
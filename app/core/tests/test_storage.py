@@ -0,0 +1,52 @@
+"""
+Tests for the content-addressed storage
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from core.storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    """Test storing files by the digest of their content"""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.storage = ContentAddressedStorage(location=self.location)
+
+    def test_file_named_by_digest(self):
+        """Test a file is stored under the digest of its content"""
+        digest = hashlib.sha256(b'image').hexdigest()
+
+        name = self.storage.save(
+            'uploads/recipe/some-uuid.JPG', ContentFile(b'image'))
+
+        self.assertEqual(name, f'uploads/recipe/{digest[:2]}/{digest}.jpg')
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), b'image')
+
+    def test_same_content_stored_once(self):
+        """Test saving the same content twice returns the same file"""
+        first = self.storage.save('uploads/recipe/a.jpg', ContentFile(b'x'))
+        second = self.storage.save('uploads/recipe/b.jpg', ContentFile(b'x'))
+        other = self.storage.save('uploads/recipe/c.jpg', ContentFile(b'y'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(
+            len(os.listdir(os.path.dirname(self.storage.path(first)))), 1)
+
+    def test_precomputed_digest_used(self):
+        """Test a digest computed while uploading is not computed again"""
+        content = ContentFile(b'image')
+        content.sha256 = 'ab' * 32
+
+        name = self.storage.save('uploads/recipe/a.png', content)
+
+        self.assertEqual(name, f'uploads/recipe/ab/{"ab" * 32}.png')
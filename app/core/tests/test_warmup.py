@@ -0,0 +1,71 @@
+"""
+Tests for warming up worker processes
+"""
+from unittest.mock import patch
+
+from django.test import (
+    SimpleTestCase,
+    override_settings,
+)
+from django.urls import (
+    clear_url_caches,
+    get_resolver,
+)
+
+from core import warmup
+from recipe.serializers import RecipeDetailSerializer
+
+
+class WarmUpTests(SimpleTestCase):
+    """Test the worker warm-up steps"""
+
+    def test_warm_up_urls(self):
+        """Test the URL resolver is populated"""
+        clear_url_caches()
+        self.addCleanup(clear_url_caches)
+
+        warmup.warm_up_urls()
+
+        self.assertTrue(get_resolver()._populated)
+
+    def test_local_serializers(self):
+        """Test only serializers of the project's apps are warmed up"""
+        classes = list(warmup._local_serializers())
+
+        self.assertIn(RecipeDetailSerializer, classes)
+        self.assertTrue(all(
+            cls.__module__.split('.')[0] in ('core', 'user', 'recipe')
+            for cls in classes
+        ))
+
+    def test_warm_up_serializers(self):
+        """Test building the serializer fields does not fail"""
+        with self.assertNoLogs('core.warmup', level='DEBUG'):
+            warmup.warm_up_serializers()
+
+    @override_settings(WORKER_WARM_UP=False)
+    @patch('core.warmup.warm_up')
+    def test_warm_up_disabled(self, patched_warm_up):
+        """Test nothing is warmed up when disabled"""
+        warmup.warm_up_worker()
+
+        patched_warm_up.assert_not_called()
+
+    @override_settings(WORKER_WARM_UP=True)
+    @patch('core.warmup.warm_up')
+    def test_connections_warmed_up_without_uwsgi(self, patched_warm_up):
+        """Test connections are opened right away outside of uwsgi"""
+        warmup.warm_up_worker()
+
+        steps = [c.args[0] for c in patched_warm_up.call_args_list]
+        self.assertEqual(steps[-1], [warmup.warm_up_connections])
+
+    @override_settings(WORKER_WARM_UP=True)
+    @patch('core.warmup.warm_up')
+    def test_connections_skipped(self, patched_warm_up):
+        """Test connections can be left to the first request"""
+        warmup.warm_up_worker(connect=False)
+
+        patched_warm_up.assert_called_once()
+        self.assertNotIn(
+            warmup.warm_up_connections, patched_warm_up.call_args.args[0])
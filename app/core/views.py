@@ -1,10 +1,38 @@
 """
 Core views for app
 """
-from rest_framework.decorators import api_view
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from core.authentication import CachedTokenAuthentication
+from core.db_pool import pool_stats
+from core.metrics import collect_metrics
+
 @api_view(['GET'])
 def health_check(request):
     """Returns successful response"""
-    return Response({'Healthy': True})
\ No newline at end of file
+    return Response({'Healthy': True})
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAdminUser])
+def db_pool(request):
+    """Return the connection pool stats of the worker"""
+    # 각 worker가 자신의 pool을 가지므로 응답한 worker의 값만 반환함
+    return Response(pool_stats())
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """Return the request metrics of every worker for Prometheus"""
+    return HttpResponse(collect_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,140 @@
+"""
+Warm-up of worker processes before they serve requests
+"""
+import importlib
+import inspect
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    connections,
+)
+from django.urls import get_resolver
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from core.schema import (
+    SCHEMA_RENDERERS,
+    schema_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+# 첫 요청에서 import되는 DRF 설정
+API_SETTINGS = (
+    'DEFAULT_RENDERER_CLASSES',
+    'DEFAULT_PARSER_CLASSES',
+    'DEFAULT_AUTHENTICATION_CLASSES',
+    'DEFAULT_PERMISSION_CLASSES',
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+    'DEFAULT_SCHEMA_CLASS',
+    'EXCEPTION_HANDLER',
+)
+
+
+def warm_up_urls():
+    """Compile the URL patterns and build the reverse lookup tables"""
+    # reverse_dict를 만들면서 include된 resolver까지 모든 regex를 compile함
+    get_resolver().reverse_dict
+
+
+def warm_up_api_settings():
+    """Import the DRF classes configured by dotted paths"""
+    # DEFAULT_SCHEMA_CLASS가 drf_spectacular.openapi를 import함
+    for name in API_SETTINGS:
+        getattr(api_settings, name)
+
+
+def _local_serializers():
+    """Yield the serializer classes of the project's apps"""
+    for app_config in apps.get_app_configs():
+        if not app_config.path.startswith(str(settings.BASE_DIR)):
+            continue
+        try:
+            module = importlib.import_module(f'{app_config.name}.serializers')
+        except ModuleNotFoundError:
+            continue
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if (cls.__module__ == module.__name__
+                    and issubclass(cls, serializers.BaseSerializer)
+                    and not issubclass(cls, serializers.ListSerializer)):
+                yield cls
+
+
+def _build_fields(serializer):
+    """Build the fields of a serializer and its nested serializers"""
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        if isinstance(field, serializers.BaseSerializer):
+            _build_fields(field)
+
+
+def warm_up_serializers():
+    """Build the serializer fields and the model metadata they read"""
+    # ModelSerializer는 field를 만들 때 model _meta의 cache도 채움
+    for cls in _local_serializers():
+        try:
+            _build_fields(cls())
+        except Exception:
+            logger.debug('Skipped warming up %s', cls, exc_info=True)
+
+
+def warm_up_schema():
+    """Load the OpenAPI schema files built for this code version"""
+    # 생성은 오래 걸리므로 build_schema가 만든 file이 있을 때만 읽어 둠
+    for fmt in SCHEMA_RENDERERS:
+        schema_cache.load(fmt, generate=False)
+
+
+def warm_up_connections():
+    """Open the database connections of this process"""
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+        except DatabaseError:
+            logger.warning(
+                'Could not connect to %s', connection.alias, exc_info=True)
+            continue
+        # 요청마다 닫는 설정이면 pool에 반환하거나 닫음
+        if not connection.settings_dict['CONN_MAX_AGE']:
+            connection.close()
+
+
+def warm_up(steps):
+    """Run the warm-up steps and log how long each took"""
+    timings = {}
+    for step in steps:
+        start = time.perf_counter()
+        step()
+        timings[step.__name__] = (time.perf_counter() - start) * 1000
+    logger.info('Warmed up worker: %s', ', '.join(
+        f'{name}={ms:.1f}ms' for name, ms in timings.items()))
+
+    return timings
+
+
+def warm_up_worker(connect=True):
+    """Build per-process structures before the first request arrives"""
+    if not settings.WORKER_WARM_UP:
+        return
+
+    # uwsgi master에서 만들면 fork된 worker가 그대로 물려받음
+    warm_up([
+        warm_up_urls,
+        warm_up_api_settings,
+        warm_up_serializers,
+        warm_up_schema,
+    ])
+    if not connect:
+        return
+    try:
+        from uwsgidecorators import postfork
+    except ImportError:
+        warm_up([warm_up_connections])
+    else:
+        # connection은 worker끼리 공유할 수 없으므로 fork 후에 엶
+        postfork(lambda: warm_up([warm_up_connections]))
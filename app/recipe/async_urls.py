@@ -0,0 +1,37 @@
+"""
+URL mappings for the async recipe APIs
+"""
+from django.urls import path
+
+from recipe import async_views
+
+app_name = 'recipe-async'
+
+urlpatterns = [
+    path(
+        'recipes/',
+        async_views.RecipeView.as_view(),
+        name='recipe-list',
+    ),
+    path(
+        'recipes/<int:pk>/',
+        async_views.RecipeView.as_view(),
+        name='recipe-detail',
+    ),
+    path('tags/', async_views.TagView.as_view(), name='tag-list'),
+    path(
+        'tags/<int:pk>/',
+        async_views.TagView.as_view(),
+        name='tag-detail',
+    ),
+    path(
+        'ingredients/',
+        async_views.IngredientView.as_view(),
+        name='ingredient-list',
+    ),
+    path(
+        'ingredients/<int:pk>/',
+        async_views.IngredientView.as_view(),
+        name='ingredient-detail',
+    ),
+]
@@ -0,0 +1,180 @@
+"""
+Async views for the read only recipe APIs
+"""
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotAuthenticated,
+    NotFound,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from core.authentication import CachedTokenAuthentication
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+from recipe import serializers
+from recipe.cache import response_cache_key
+from recipe.filters import (
+    filter_assigned,
+    filter_recipes,
+    parse_pantry,
+)
+from recipe.pagination import (
+    AsyncRecipeCursorPagination,
+    AsyncRecipeAttrCursorPagination,
+)
+from recipe.pantry import pantry_indexes
+
+
+class AsyncAPIView(View):
+    """Read only API view which waits for the database in the event loop"""
+    # ASGI에서 실행되면 DB를 기다리는 동안 worker가 다른 요청을 처리함
+    # 인증, filter, pagination, 응답 cache는 sync viewset과 같은 code를 사용함
+    authentication_class = CachedTokenAuthentication
+    model = None
+    pagination_class = None
+    serializer_class = None
+    list_serializer_class = None
+    basename = None
+    list_cache_timeout = 60 * 60
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Authenticate the request and render API errors as JSON"""
+        # DRF와 같이 method를 확인하기 전에 인증함
+        try:
+            self.request = Request(request)
+            self.request.user = await self.authenticate(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(exc)
+
+    async def authenticate(self, request):
+        """Return the user of the token, or raise 401"""
+        # cache miss이면 token을 조회하므로 thread에서 실행함
+        authenticator = self.authentication_class()
+        result = await sync_to_async(authenticator.authenticate)(request)
+        if result is None:
+            raise NotAuthenticated()
+
+        return result[0]
+
+    def handle_exception(self, exc):
+        """Return the response DRF would render for the exception"""
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            exc.auth_header = self.authentication_class().authenticate_header(
+                self.request)
+        response = exception_handler(exc, {'view': self})
+        headers = {
+            name: value for name, value in response.items()
+            if name != 'Content-Type'
+        }
+
+        return self.render(response.data, response.status_code, headers)
+
+    def render(self, data, status=200, headers=None):
+        """Render data as a JSON response"""
+        return HttpResponse(
+            JSONRenderer().render(data),
+            status=status,
+            headers=headers,
+            content_type='application/json',
+        )
+
+    async def get_queryset(self):
+        """Return the objects of the authenticated user"""
+        return self.model.objects.filter(user=self.request.user)
+
+    async def get(self, request, pk=None):
+        """List or retrieve objects"""
+        if pk is not None:
+            return await self.retrieve(pk)
+
+        return await self.list()
+
+    async def retrieve(self, pk):
+        """Return a single object"""
+        queryset = await self.get_queryset()
+        obj = await queryset.filter(pk=pk).afirst()
+        if obj is None:
+            raise NotFound()
+
+        return self.render(self.serializer_class(
+            obj, context={'request': self.request}).data)
+
+    async def list(self):
+        """Return a page of objects, cached until the user's data changes"""
+        # link가 sync API와 다르므로 별도의 이름으로 cache함
+        key = await sync_to_async(response_cache_key)(
+            self.request, f'async-{self.basename}')
+        data = await cache.aget(key)
+        if data is None:
+            paginator = self.pagination_class()
+            page = await paginator.apaginate_queryset(
+                await self.get_queryset(), self.request, self)
+            data = paginator.get_paginated_data(self.list_serializer_class(
+                page, many=True, context={'request': self.request}).data)
+            await cache.aset(key, data, self.list_cache_timeout)
+
+        return self.render(data)
+
+
+class RecipeView(AsyncAPIView):
+    """List and retrieve recipes"""
+    model = Recipe
+    pagination_class = AsyncRecipeCursorPagination
+    serializer_class = serializers.RecipeDetailSerializer
+    list_serializer_class = serializers.RecipeSerializer
+    basename = 'recipe'
+
+    async def get_queryset(self):
+        """Retrieve filtered recipes for the authenticated user"""
+        params = self.request.query_params
+        pantry = parse_pantry(params)
+        pantry_ids = None
+        if pantry is not None:
+            # index를 다시 만들 때 DB를 조회하므로 thread에서 실행함
+            pantry_ids = await sync_to_async(pantry_indexes.match)(
+                self.request.user.pk, *pantry)
+
+        return filter_recipes(
+            await super().get_queryset(), params, pantry_ids,
+        ).defer('search_vector').prefetch_related(
+            'tags',
+            'ingredients',
+        )
+
+
+class BaseRecipeAttrView(AsyncAPIView):
+    """List and retrieve recipe attributes"""
+    pagination_class = AsyncRecipeAttrCursorPagination
+
+    async def get_queryset(self):
+        """Filter objects to the authenticated user"""
+        return filter_assigned(
+            await super().get_queryset(), self.request.query_params,
+        )
+
+
+class TagView(BaseRecipeAttrView):
+    """List and retrieve tags"""
+    model = Tag
+    serializer_class = serializers.TagSerializer
+    list_serializer_class = serializers.TagSerializer
+    basename = 'tag'
+
+
+class IngredientView(BaseRecipeAttrView):
+    """List and retrieve ingredients"""
+    model = Ingredient
+    serializer_class = serializers.IngredientSerializer
+    list_serializer_class = serializers.IngredientSerializer
+    basename = 'ingredient'
@@ -0,0 +1,152 @@
+"""
+Response cache for the recipe APIs
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    http_date,
+    quote_etag,
+)
+from rest_framework.response import Response
+
+VERSION_KEY = 'recipe-api:version:{user_id}'
+MODIFIED_KEY = 'recipe-api:modified:{user_id}'
+RESPONSE_KEY = 'recipe-api:{name}:{user_id}:{version}:{params}'
+
+
+def get_user_version(user_id):
+    """Return the current cache version of the user"""
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # version key가 evict 되어도 예전 version과 겹치지 않도록
+        # 현재 시각으로 초기화함
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_user_modified(user_id):
+    """Return the timestamp of the last change to the user's data"""
+    key = MODIFIED_KEY.format(user_id=user_id)
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, int(time.time()), timeout=None)
+        modified = cache.get(key)
+
+    return modified
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached response of the user"""
+    cache.set(
+        MODIFIED_KEY.format(user_id=user_id),
+        int(time.time()),
+        timeout=None,
+    )
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return get_user_version(user_id)
+
+
+def _params_digest(request):
+    """Return a digest of the request query string"""
+    params = sorted(request.query_params.lists())
+    return hashlib.md5(repr(params).encode()).hexdigest()
+
+
+def response_cache_key(request, name):
+    """Return the cache key of a response for the user and query string"""
+    return RESPONSE_KEY.format(
+        name=name,
+        user_id=request.user.pk,
+        version=get_user_version(request.user.pk),
+        params=_params_digest(request),
+    )
+
+
+def set_validators(response, etag, last_modified):
+    """Add ETag and Last-Modified headers to a successful response"""
+    if response.status_code == 200:
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+
+    return response
+
+
+class CachedListMixin:
+    """Cache list responses per user until the user's data changes"""
+    list_cache_timeout = 60 * 60
+
+    def list(self, request, *args, **kwargs):
+        """Return the cached list response if there is one"""
+        # version이 바뀌면 key가 달라지므로 예전 응답을 지울 필요가 없음
+        key = response_cache_key(request, self.basename)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.list_cache_timeout)
+
+        return response
+
+
+class ConditionalGetMixin:
+    """Answer conditional GET requests without running the serializers"""
+
+    def list(self, request, *args, **kwargs):
+        """Return 304 when the user's data has not changed"""
+        # user data가 바뀔 때마다 version이 바뀌므로
+        # DB를 조회하지 않고 version과 query string으로 ETag를 만듦
+        version = get_user_version(request.user.pk)
+        etag = quote_etag(hashlib.md5(
+            f'{self.basename}:{version}:{_params_digest(request)}'.encode()
+        ).hexdigest())
+        last_modified = get_user_modified(request.user.pk)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = set_validators(
+                super().list(request, *args, **kwargs),
+                etag,
+                last_modified,
+            )
+
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return 304 when the object has not been updated"""
+        # 잘못된 pk는 get_object()가 404로 응답하도록 넘김
+        try:
+            updated_at = self.queryset.filter(
+                user=request.user,
+                pk=kwargs[self.lookup_field],
+            ).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            updated_at = None
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        last_modified = int(updated_at.timestamp())
+        etag = quote_etag(
+            f'{kwargs[self.lookup_field]}-{updated_at.timestamp()}')
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = set_validators(
+                super().retrieve(request, *args, **kwargs),
+                etag,
+                last_modified,
+            )
+
+        return response
@@ -0,0 +1,158 @@
+"""
+Queryset filters for the recipe APIs
+"""
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+)
+from django.db import connections
+from django.db.models import (
+    Case,
+    DecimalField,
+    Exists,
+    F,
+    OuterRef,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast
+from rest_framework.exceptions import ValidationError
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+MATCH_CHOICES = (MATCH_ANY, MATCH_ALL)
+
+SEARCH_CONFIG = 'english'
+SEARCH_TERM_RE = re.compile(r'[^\W_]+')
+# cursor에 rank를 문자열로 담았다가 다시 비교하므로 float 대신 decimal을 사용함
+RANK_FIELD = DecimalField(max_digits=12, decimal_places=8)
+
+
+def params_to_ints(qs):
+    """Conver a list of strings to integers"""
+    return [int(str_id) for str_id in qs.split(',')]
+
+
+def parse_max_missing(params):
+    """Return the number of ingredients a pantry recipe may miss"""
+    try:
+        max_missing = int(params.get('max_missing', 0))
+    except ValueError:
+        max_missing = -1
+    if max_missing < 0:
+        raise ValidationError(
+            {'max_missing': ['Must be a non-negative integer.']})
+
+    return max_missing
+
+
+def parse_pantry(params):
+    """Return the pantry ingredient ids and max_missing, or None"""
+    pantry = params.get('pantry')
+    if pantry is None:
+        return None
+
+    try:
+        pantry_ids = params_to_ints(pantry) if pantry else []
+    except ValueError:
+        raise ValidationError(
+            {'pantry': ['Must be a comma separated list of ids.']})
+
+    return pantry_ids, parse_max_missing(params)
+
+
+def filter_recipes(queryset, params, pantry_ids=None):
+    """Apply the recipe list query parameters and ordering to a queryset"""
+    # sync viewset과 async view가 같은 filter semantics를 갖도록 공유함
+    # pantry index 조회는 worker 안의 cache를 사용하므로 호출하는 쪽에서 처리함
+    tags = params.get('tags')
+    ingredients = params.get('ingredients')
+    search = params.get('search')
+    match = params.get('match', MATCH_ANY)
+    if match not in MATCH_CHOICES:
+        raise ValidationError({'match': ["Must be 'any' or 'all'."]})
+    if tags:
+        queryset = filter_by_related(
+            queryset, 'tags', params_to_ints(tags), match)
+    if ingredients:
+        queryset = filter_by_related(
+            queryset, 'ingredients', params_to_ints(ingredients), match)
+    if pantry_ids is not None:
+        queryset = queryset.filter(id__in=pantry_ids)
+    ordering = ('-id',)
+    if search:
+        queryset = search_recipes(queryset, search)
+        ordering = ('-rank', '-id')
+
+    return queryset.order_by(*ordering)
+
+
+def filter_assigned(queryset, params):
+    """Filter tags or ingredients assigned to a recipe when requested"""
+    if bool(int(params.get('assigned_only', 0))):
+        queryset = queryset.filter(recipe__isnull=False)
+
+    return queryset.order_by('-name').distinct()
+
+
+def filter_by_related(queryset, field, ids, match=MATCH_ANY):
+    """Filter recipes related to any or all of the given object ids"""
+    # join 대신 through table에 대한 correlated EXISTS를 사용하므로
+    # recipe row가 중복되지 않아 distinct()가 필요 없음
+    through = getattr(Recipe, field).through
+    related_field = getattr(Recipe, field).field.m2m_reverse_field_name()
+    rows = through.objects.filter(recipe_id=OuterRef('pk'))
+    if match == MATCH_ALL:
+        # id마다 (recipe_id, object_id) unique index를 한 번씩 탐색함
+        for obj_id in set(ids):
+            queryset = queryset.filter(
+                Exists(rows.filter(**{f'{related_field}_id': obj_id})),
+            )
+        return queryset
+
+    return queryset.filter(
+        Exists(rows.filter(**{f'{related_field}_id__in': ids})),
+    )
+
+
+def search_recipes(queryset, text):
+    """Filter recipes matching every word of the text and annotate rank"""
+    terms = SEARCH_TERM_RE.findall(text)
+    if not terms:
+        return queryset.annotate(rank=Value(0, RANK_FIELD)).none()
+
+    if connections[queryset.db].vendor == 'postgresql':
+        # 각 단어를 prefix로 검색하여 입력 중인 단어도 찾을 수 있도록 함
+        query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            config=SEARCH_CONFIG,
+            search_type='raw',
+        )
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), RANK_FIELD),
+        )
+
+    # search_vector가 없는 DB에서는 LIKE로 같은 column을 검색하고
+    # title에 포함된 단어 수로 순위를 매김
+    rank = Value(0)
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term)
+            | Q(description__icontains=term)
+            | Exists(Tag.objects.filter(
+                recipe=OuterRef('pk'), name__icontains=term))
+            | Exists(Ingredient.objects.filter(
+                recipe=OuterRef('pk'), name__icontains=term))
+        )
+        rank = rank + Case(When(title__icontains=term, then=1), default=0)
+
+    return queryset.annotate(rank=Cast(rank, RANK_FIELD))
@@ -0,0 +1,154 @@
+"""
+Resized and WebP variants of recipe images
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from PIL import (
+    Image,
+    ImageOps,
+)
+
+from core.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+# 확장자별 Pillow format
+VARIANT_FORMATS = {
+    'jpg': 'JPEG',
+    'webp': 'WEBP',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_dir(name):
+    """Return the storage directory of the variants of an image"""
+    # uploads/recipe/<uuid>.jpg -> uploads/recipe/variants/<uuid>
+    head, filename = os.path.split(name)
+    return os.path.join(head, 'variants', os.path.splitext(filename)[0])
+
+
+def variant_name(name, size, ext):
+    """Return the storage name of a variant of an image"""
+    return os.path.join(variant_dir(name), f'{size}.{ext}')
+
+
+def source_lookup(name):
+    """Return lookups matching the recipe image a stored file belongs to"""
+    # uploads/recipe/ab/variants/<digest>/small.webp
+    # -> image가 uploads/recipe/ab/<digest>.* 인 recipe
+    head, sep, rest = name.partition('/variants/')
+    if sep:
+        return {'image__startswith': f'{head}/{rest.split("/")[0]}.'}
+
+    return {'image': name}
+
+
+def variant_urls(image):
+    """Return variant URLs, or the original URL until they are ready"""
+    # 모든 variant를 만든 뒤 directory를 한 번에 rename하므로
+    # directory가 있으면 모든 variant가 준비된 것임
+    ready = image.storage.exists(variant_dir(image.name))
+    sizes = settings.RECIPE_IMAGE_VARIANTS['SIZES']
+
+    return {
+        size: {
+            ext: (
+                image.storage.url(variant_name(image.name, size, ext))
+                if ready else image.url
+            )
+            for ext in VARIANT_FORMATS
+        }
+        for size in sizes
+    }
+
+
+def generate_variants(source, target, sizes, quality):
+    """Write resized JPEG and WebP copies of an image into a directory"""
+    # process pool에서 실행되므로 Django 없이 file path만 사용함
+    if os.path.exists(target):
+        return
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+    workdir = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        with Image.open(source) as original:
+            img = ImageOps.exif_transpose(original)
+            for size, pixels in sizes.items():
+                resized = img.copy()
+                resized.thumbnail((pixels, pixels))
+                for ext, fmt in VARIANT_FORMATS.items():
+                    out = resized
+                    if fmt == 'JPEG' and out.mode != 'RGB':
+                        out = out.convert('RGB')
+                    out.save(
+                        os.path.join(workdir, f'{size}.{ext}'),
+                        format=fmt,
+                        quality=quality,
+                    )
+        os.rename(workdir, target)
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+
+
+def _get_executor():
+    """Return the process pool, starting it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.RECIPE_IMAGE_VARIANTS['WORKERS'],
+            )
+
+        return _executor
+
+
+def touch_recipe(recipe_id):
+    """Mark the recipe as updated once its variants are ready"""
+    # 응답의 image URL이 바뀌므로 ETag도 바뀌도록 updated_at을 갱신함
+    Recipe.objects.filter(pk=recipe_id).update(updated_at=timezone.now())
+
+
+def _variants_done(recipe_id, request_thread, future):
+    """Touch the recipe or log the error of a finished variant job"""
+    error = future.exception()
+    if error is not None:
+        logger.error('Failed to generate image variants', exc_info=error)
+        return
+    try:
+        touch_recipe(recipe_id)
+    finally:
+        # executor thread에서 열린 connection은 Django가 닫지 않으므로 직접 닫음
+        # 이미 끝난 job이면 callback이 request thread에서 바로 실행됨
+        if threading.get_ident() != request_thread:
+            connection.close()
+
+
+def queue_variants(recipe):
+    """Generate the variants of a recipe image outside of the request"""
+    config = settings.RECIPE_IMAGE_VARIANTS
+    args = (
+        recipe.image.path,
+        recipe.image.storage.path(variant_dir(recipe.image.name)),
+        config['SIZES'],
+        config['QUALITY'],
+    )
+    # WORKERS가 0이면 process pool 없이 바로 생성함 (test, debug용)
+    if not config['WORKERS']:
+        generate_variants(*args)
+        touch_recipe(recipe.pk)
+        return
+
+    _get_executor().submit(generate_variants, *args).add_done_callback(
+        partial(_variants_done, recipe.pk, threading.get_ident()))
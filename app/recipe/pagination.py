@@ -0,0 +1,118 @@
+"""
+Pagination classes for the recipe APIs
+"""
+from django.conf import settings
+from rest_framework.pagination import (
+    CursorPagination,
+    _reverse_ordering,
+)
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination for recipes ordered by newest first"""
+    # cursor에 마지막 row의 ordering 값을 담아 WHERE 조건으로 다음 page를 조회함
+    # OFFSET을 사용하지 않기 때문에 몇 번째 page든 조회 비용이 같음
+    ordering = '-id'
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    search_ordering = ('-rank', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        """Order search results by rank"""
+        if self.search_ordering and request.query_params.get('search'):
+            return self.search_ordering
+
+        return super().get_ordering(request, queryset, view)
+
+
+class RecipeAttrCursorPagination(RecipeCursorPagination):
+    """Keyset pagination for tags and ingredients ordered by name"""
+    ordering = ('-name', '-id')
+    search_ordering = None
+
+
+class AsyncCursorPaginationMixin:
+    """Cursor pagination which fetches the page with the async ORM"""
+    # DRF의 paginate_queryset과 같은 cursor 계산을 하되
+    # page를 조회하는 query만 event loop에서 await함
+
+    def _page_queryset(self, queryset, request, view=None):
+        """Return the queryset of the page and the decoded cursor"""
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            order = self.ordering[0]
+            order_attr = order.lstrip('-')
+            if self.cursor.reverse != order.startswith('-'):
+                lookup = f'{order_attr}__lt'
+            else:
+                lookup = f'{order_attr}__gt'
+            queryset = queryset.filter(**{lookup: current_position})
+
+        # 다음 page가 있는지 알기 위해 한 row를 더 조회함
+        return (
+            queryset[offset:offset + self.page_size + 1],
+            offset,
+            reverse,
+            current_position,
+        )
+
+    def _set_page(self, results, offset, reverse, current_position):
+        """Store the page and the positions of the next and previous pages"""
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering)
+        has_following = following_position is not None
+        has_preceding = current_position is not None or offset > 0
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = has_preceding, has_following
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next, self.has_previous = has_following, has_preceding
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        return self.page
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Return a page of objects fetched with the async ORM"""
+        self.page_size = self.get_page_size(request)
+        queryset, *cursor = self._page_queryset(queryset, request, view)
+        # async iteration도 prefetch_related를 함께 실행함
+        results = [obj async for obj in queryset]
+
+        return self._set_page(results, *cursor)
+
+    def get_paginated_data(self, data):
+        """Return the body of a paginated response"""
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+
+class AsyncRecipeCursorPagination(AsyncCursorPaginationMixin,
+                                  RecipeCursorPagination):
+    """Async keyset pagination for recipes"""
+
+
+class AsyncRecipeAttrCursorPagination(AsyncCursorPaginationMixin,
+                                      RecipeAttrCursorPagination):
+    """Async keyset pagination for tags and ingredients"""
@@ -0,0 +1,196 @@
+"""
+In-process ingredient index for "what can I cook" queries
+"""
+import threading
+import time
+from collections import (
+    OrderedDict,
+    defaultdict,
+)
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models import Recipe
+
+PANTRY_VERSION_KEY = 'recipe-api:pantry:{user_id}'
+
+
+class PantryIndex:
+    """Inverted index of a user's recipes by ingredient"""
+    # recipe마다 bit 위치를 할당하고 ingredient별로 그 재료를 쓰는
+    # recipe의 bitmap(int)을 저장함
+    # 재료 수가 같은 recipe끼리도 bitmap으로 묶어 두어
+    # 부분집합 검색을 through table 집계 없이 bit 연산으로 처리함
+
+    def __init__(self, version, rows=()):
+        self.version = version
+        self.positions = {}
+        self.recipe_ids = []
+        self.recipe_ingredients = defaultdict(set)
+        self.ingredient_recipes = defaultdict(int)
+        self.by_count = defaultdict(int)
+        for recipe_id, ingredient_id in rows:
+            self.add(recipe_id, ingredient_id)
+
+    def _bit(self, recipe_id):
+        """Return the bit of the recipe, assigning a new one if needed"""
+        position = self.positions.get(recipe_id)
+        if position is None:
+            position = self.positions[recipe_id] = len(self.recipe_ids)
+            self.recipe_ids.append(recipe_id)
+
+        return 1 << position
+
+    def _move(self, bit, old_count, new_count):
+        """Move the recipe bit between the ingredient count groups"""
+        if old_count:
+            self.by_count[old_count] &= ~bit
+            if not self.by_count[old_count]:
+                del self.by_count[old_count]
+        if new_count:
+            self.by_count[new_count] |= bit
+
+    def add(self, recipe_id, ingredient_id):
+        """Record that the recipe uses the ingredient"""
+        ingredients = self.recipe_ingredients[recipe_id]
+        if ingredient_id in ingredients:
+            return
+        bit = self._bit(recipe_id)
+        ingredients.add(ingredient_id)
+        self.ingredient_recipes[ingredient_id] |= bit
+        self._move(bit, len(ingredients) - 1, len(ingredients))
+
+    def remove(self, recipe_id, ingredient_id):
+        """Record that the recipe no longer uses the ingredient"""
+        ingredients = self.recipe_ingredients.get(recipe_id)
+        if not ingredients or ingredient_id not in ingredients:
+            return
+        bit = self._bit(recipe_id)
+        ingredients.remove(ingredient_id)
+        self.ingredient_recipes[ingredient_id] &= ~bit
+        if not self.ingredient_recipes[ingredient_id]:
+            del self.ingredient_recipes[ingredient_id]
+        self._move(bit, len(ingredients) + 1, len(ingredients))
+
+    def remove_recipe(self, recipe_id):
+        """Remove every ingredient of the recipe"""
+        for ingredient_id in list(self.recipe_ingredients.get(recipe_id, ())):
+            self.remove(recipe_id, ingredient_id)
+
+    def remove_ingredient(self, ingredient_id):
+        """Remove the ingredient from every recipe"""
+        for recipe_id in self._decode(
+            self.ingredient_recipes.get(ingredient_id, 0)
+        ):
+            self.remove(recipe_id, ingredient_id)
+
+    def _decode(self, bits):
+        """Return the recipe ids of the set bits"""
+        recipe_ids = []
+        while bits:
+            lowest = bits & -bits
+            recipe_ids.append(self.recipe_ids[lowest.bit_length() - 1])
+            bits ^= lowest
+
+        return recipe_ids
+
+    def match(self, ingredient_ids, max_missing=0):
+        """Return ids of recipes missing at most max_missing ingredients"""
+        have = [
+            self.ingredient_recipes[ingredient_id]
+            for ingredient_id in set(ingredient_ids)
+            if ingredient_id in self.ingredient_recipes
+        ]
+        # at_least[n]: 가진 재료를 n개 이상 사용하는 recipe의 bitmap
+        depth = min(len(have), max(self.by_count, default=0))
+        at_least = [0] * (depth + 1)
+        for bits in self.by_count.values():
+            at_least[0] |= bits
+        for bits in have:
+            for n in range(depth, 0, -1):
+                at_least[n] |= at_least[n - 1] & bits
+
+        matched = 0
+        for count, bits in self.by_count.items():
+            needed = max(count - max_missing, 0)
+            if needed <= depth:
+                matched |= bits & at_least[needed]
+
+        return self._decode(matched)
+
+
+class PantryIndexCache:
+    """Bounded in-process LRU cache of per-user pantry indexes"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def match(self, user_id, ingredient_ids, max_missing=0):
+        """Return ids of the user's recipes cookable from the ingredients"""
+        # 다른 worker에서 재료가 바뀌었다면 version이 달라지므로 새로 만듦
+        version = get_pantry_version(user_id)
+        with self._lock:
+            index = self._entries.get(user_id)
+            if index is not None and index.version == version:
+                self._entries.move_to_end(user_id)
+                return index.match(ingredient_ids, max_missing)
+
+        index = PantryIndex(version, build_rows(user_id))
+        with self._lock:
+            self._entries[user_id] = index
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return index.match(ingredient_ids, max_missing)
+
+    def apply(self, user_id, change):
+        """Apply a change to the user's index and publish a new version"""
+        version = bump_pantry_version(user_id)
+        with self._lock:
+            index = self._entries.get(user_id)
+            if index is None:
+                return
+            # 바로 이전 version의 index일 때만 변경을 적용할 수 있음
+            # 그 사이 다른 변경이 있었다면 다음 조회 때 새로 만듦
+            if index.version == version - 1:
+                change(index)
+                index.version = version
+            else:
+                del self._entries[user_id]
+
+    def clear(self):
+        """Remove every index from the cache"""
+        with self._lock:
+            self._entries.clear()
+
+
+def build_rows(user_id):
+    """Return the (recipe id, ingredient id) pairs of the user's recipes"""
+    return Recipe.ingredients.through.objects.filter(
+        recipe__user_id=user_id,
+    ).values_list('recipe_id', 'ingredient_id')
+
+
+def get_pantry_version(user_id):
+    """Return the current version of the user's recipe ingredients"""
+    key = PANTRY_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_pantry_version(user_id):
+    """Mark every pantry index of the user as outdated"""
+    try:
+        return cache.incr(PANTRY_VERSION_KEY.format(user_id=user_id))
+    except ValueError:
+        return get_pantry_version(user_id)
+
+
+pantry_indexes = PantryIndexCache(max_size=settings.PANTRY_INDEX_MAX_USERS)
@@ -1,10 +1,21 @@
 """
 Serializers for recipe APIs
 """
+import os
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
 from rest_framework import serializers
 from core.models import (Recipe,
                          Tag,
                          Ingredient)
+from recipe.images import variant_urls
+from recipe.uploads import (
+    IMAGE_EXTENSIONS,
+    ImageRejected,
+    validate_image,
+)
 
 class TagSerializer(serializers.ModelSerializer):
     """Serializer for tags"""
@@ -24,6 +35,121 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+    """Serializer for creating and updating many recipes in a batch"""
+
+    def _bulk_set(self, field, model, recipes, nested, existing=()):
+        """Replace the named objects of recipes with batched queries"""
+        # nested가 None인 recipe는 관계를 변경하지 않음
+        changes = [
+            (recipe, items) for recipe, items in zip(recipes, nested)
+            if items is not None
+        ]
+        # batch 전체의 이름을 한 번에 조회/생성함
+        objs = {
+            obj.name: obj
+            for obj in self.child._get_or_create_objects(
+                model,
+                [item for recipe, items in changes for item in items],
+            )
+        }
+        through = getattr(Recipe, field).through
+        obj_field = f'{model._meta.model_name}_id'
+        rows = {
+            (recipe.id, objs[item['name']].id)
+            for recipe, items in changes
+            for item in items
+        }
+        # 이미 있는 recipe는 현재 through row와 비교하여
+        # 바뀐 row만 한 번의 delete/insert로 반영함
+        update_ids = [
+            recipe.id for recipe, items in changes if recipe.id in existing
+        ]
+        current = {}
+        if update_ids:
+            current = {
+                (recipe_id, obj_id): pk
+                for pk, recipe_id, obj_id in through.objects.filter(
+                    recipe_id__in=update_ids,
+                ).values_list('id', 'recipe_id', obj_field)
+            }
+            stale = [pk for row, pk in current.items() if row not in rows]
+            if stale:
+                through.objects.filter(id__in=stale).delete()
+        through.objects.bulk_create(
+            [
+                through(recipe_id=recipe_id, **{obj_field: obj_id})
+                for recipe_id, obj_id in rows
+                if (recipe_id, obj_id) not in current
+            ],
+            ignore_conflicts=True,
+        )
+
+    def _bulk_update(self, updated):
+        """Save changed columns with one UPDATE per set of fields"""
+        now = timezone.now()
+        groups = {}
+        for instance, attrs, relations in updated:
+            # 값이 바뀐 column만 UPDATE 함
+            update_fields = [
+                attr for attr, value in attrs.items()
+                if getattr(instance, attr) != value
+            ]
+            for attr in update_fields:
+                setattr(instance, attr, attrs[attr])
+            # bulk_update는 auto_now를 적용하지 않으므로 updated_at을 직접 갱신함
+            if update_fields or any(
+                items is not None for items in relations
+            ):
+                instance.updated_at = now
+                key = tuple(sorted(update_fields)) + ('updated_at',)
+                groups.setdefault(key, []).append(instance)
+
+        for fields, changed in groups.items():
+            Recipe.objects.bulk_update(changed, fields)
+
+    @transaction.atomic
+    def save_all(self, instances, validated_data):
+        """Create or update recipes with batched queries"""
+        # instance가 None인 item은 create, 나머지는 update로 처리함
+        # update에서 tags/ingredients가 없으면 None으로 두어 관계를 유지함
+        tags = [
+            attrs.pop('tags', [] if instance is None else None)
+            for instance, attrs in zip(instances, validated_data)
+        ]
+        ingredients = [
+            attrs.pop('ingredients', [] if instance is None else None)
+            for instance, attrs in zip(instances, validated_data)
+        ]
+        created = iter(Recipe.objects.bulk_create([
+            Recipe(**attrs)
+            for instance, attrs in zip(instances, validated_data)
+            if instance is None
+        ]))
+        updated = [
+            (instance, attrs, relations)
+            for instance, attrs, relations in zip(
+                instances, validated_data, zip(tags, ingredients),
+            )
+            if instance is not None
+        ]
+        self._bulk_update(updated)
+        recipes = [
+            next(created) if instance is None else instance
+            for instance in instances
+        ]
+        existing = {instance.id for instance, attrs, relations in updated}
+        self._bulk_set('tags', Tag, recipes, tags, existing)
+        self._bulk_set('ingredients', Ingredient, recipes, ingredients,
+                       existing)
+
+        return recipes
+
+    def create(self, validated_data):
+        """Create recipes with batched inserts"""
+        return self.save_all([None] * len(validated_data), validated_data)
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     """Serializer for recipe"""
     tags = TagSerializer(many=True, required=False)
@@ -36,27 +162,46 @@ class RecipeSerializer(serializers.ModelSerializer):
             'ingredients',
             ]
         read_only_fields = ['id']
+        list_serializer_class = RecipeListSerializer
 
-    def _get_or_create_ingredients(self, ingredients, recipe):
-        """Handle getting or creating ingredients as needed"""
+    def _get_or_create_objects(self, model, items):
+        """Return objects for the given names, creating missing ones"""
         auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
+        # payload 순서를 유지하면서 중복된 이름을 제거함
+        names = list(dict.fromkeys(item['name'] for item in items))
+        if not names:
+            return []
+
+        queryset = model.objects.filter(user=auth_user)
+        objs = {obj.name: obj for obj in queryset.filter(name__in=names)}
+        missing = [name for name in names if name not in objs]
+        if missing:
+            # (user, name) unique constraint에 걸리는 row는 insert하지 않음
+            # (INSERT ... ON CONFLICT DO NOTHING)
+            model.objects.bulk_create(
+                [model(user=auth_user, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            # 동시에 같은 이름을 생성한 요청이 있을 수 있으므로
+            # insert한 객체 대신 DB에 저장된 객체를 다시 조회함
+            objs.update(
+                (obj.name, obj)
+                for obj in queryset.filter(name__in=missing)
             )
-            recipe.ingredients.add(ingredient_obj)
+
+        return [objs[name] for name in names]
+
+    def _get_or_create_ingredients(self, ingredients, recipe):
+        """Handle getting or creating ingredients as needed"""
+        recipe.ingredients.add(
+            *self._get_or_create_objects(Ingredient, ingredients)
+        )
 
     def _get_or_create_tags(self, tags, recipe):
         """Handle getting or creating tags as needed"""
-        auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tag_obj)
+        recipe.tags.add(*self._get_or_create_objects(Tag, tags))
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create a recipe"""
         # 'tags'가 있다면 pop 없다면 빈 리스트를 저장
@@ -68,6 +213,7 @@ class RecipeSerializer(serializers.ModelSerializer):
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update recipe"""
         # 'tags'가 있다면 pop 없다면 tags에 None을 부여
@@ -76,34 +222,211 @@ class RecipeSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags', None)
         ingredients = validated_data.pop('ingredients', None)
         # tag를 업데이트 해야하는지 None 여부로 결정
+        # set()은 현재 관계와 비교하여 바뀐 through row만 insert/delete 함
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            instance.tags.set(self._get_or_create_objects(Tag, tags))
 
         if ingredients is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
+            instance.ingredients.set(
+                self._get_or_create_objects(Ingredient, ingredients)
+            )
+
+        # 값이 바뀐 column만 UPDATE 하고, 바뀐 값이 없다면 save를 생략함
+        update_fields = [
+            attr for attr, value in validated_data.items()
+            if getattr(instance, attr) != value
+        ]
+        for attr in update_fields:
+            setattr(instance, attr, validated_data[attr])
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
+        # auto_now field는 update_fields에 있어야 저장되며,
+        # tags/ingredients가 바뀌어도 응답이 바뀌므로 updated_at을 갱신함
+        if update_fields or tags is not None or ingredients is not None:
+            update_fields.append('updated_at')
 
-        instance.save()
+        if update_fields:
+            instance.save(update_fields=update_fields)
 
         return instance
 
 
-class RecipeDetailSerializer(RecipeSerializer):
+class ImageVariantsMixin(serializers.Serializer):
+    """Add the URLs of the resized recipe image variants"""
+    # variant가 준비되기 전에는 모든 URL이 원본 image를 가리킴
+    image_variants = serializers.SerializerMethodField()
+
+    def get_image_variants(self, obj):
+        """Return variant URLs by size and format"""
+        if not obj.image:
+            return None
+
+        urls = variant_urls(obj.image)
+        request = self.context.get('request')
+        if request is not None:
+            urls = {
+                size: {
+                    ext: request.build_absolute_uri(url)
+                    for ext, url in formats.items()
+                }
+                for size, formats in urls.items()
+            }
+
+        return urls
+
+
+class RecipeDetailSerializer(ImageVariantsMixin, RecipeSerializer):
     """Serializer for recipe details"""
 
     class Meta(RecipeSerializer.Meta):
-        fields = RecipeSerializer.Meta.fields + ['description', 'image',]
+        fields = RecipeSerializer.Meta.fields + [
+            'description', 'image', 'image_variants',
+        ]
 
 
-class RecipeImageSerializer(serializers.ModelSerializer):
+class RecipeImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     """Serializer for uploading images to recipes"""
+    # ImageField는 Pillow로 파일 전체를 verify 하므로
+    # FileField로 받고 header만 읽어서 검사함
+    image = serializers.FileField(required=True)
 
     class Meta:
         model = Recipe
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'image_variants']
         read_only_fields = ['id']
-        extra_kwargs = {'image': {'required': 'True'}}
\ No newline at end of file
+
+    def validate_image(self, value):
+        """Check the image format and size from its header"""
+        try:
+            fmt = validate_image(value)
+        except ImageRejected as exc:
+            raise serializers.ValidationError(str(exc))
+        # client가 보낸 확장자 대신 실제 format의 확장자로 저장함
+        stem = os.path.splitext(value.name)[0]
+        value.name = f'{stem}{IMAGE_EXTENSIONS[fmt]}'
+
+        return value
+
+
+class RecipeBulkSerializer(serializers.Serializer):
+    """Serializer for creating, updating and deleting recipes in bulk"""
+    # id가 있는 recipe는 update, 없는 recipe는 create로 처리함
+    recipes = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        max_length=1000,
+    )
+    delete = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        max_length=1000,
+    )
+
+    def validate(self, attrs):
+        """Validate every item and report errors by item position"""
+        auth_user = self.context['request'].user
+        items = attrs.get('recipes', [])
+        delete_ids = attrs.get('delete', [])
+        # item은 DictField로 받으므로 id를 조회하기 전에 정수로 변환함
+        ids, id_errors = [], {}
+        for index, item in enumerate(items):
+            if 'id' not in item:
+                ids.append(None)
+                continue
+            try:
+                ids.append(
+                    serializers.IntegerField().run_validation(item['id']))
+            except serializers.ValidationError as exc:
+                ids.append(None)
+                id_errors[index] = exc.detail
+        update_ids = [recipe_id for recipe_id in ids if recipe_id is not None]
+        instances = Recipe.objects.filter(
+            user=auth_user,
+            id__in=update_ids + delete_ids,
+        ).defer('search_vector').in_bulk()
+
+        operations, errors = [], []
+        seen = set()
+        for index, (item, recipe_id) in enumerate(zip(items, ids)):
+            instance = None
+            if index in id_errors:
+                errors.append({'id': id_errors[index]})
+                continue
+            # 같은 recipe를 여러 번 update하면 item 중 어느 것과도
+            # 다른 결과가 저장되므로 두 번째 item부터 에러로 처리함
+            if recipe_id in seen:
+                errors.append({'id': [_('Repeated in recipes.')]})
+                continue
+            if recipe_id is not None:
+                seen.add(recipe_id)
+            if recipe_id is not None:
+                instance = instances.get(recipe_id)
+                if instance is None:
+                    errors.append({'id': [_('Not found.')]})
+                    continue
+            serializer = RecipeDetailSerializer(
+                instance,
+                data=item,
+                partial=instance is not None,
+                context=self.context,
+            )
+            if serializer.is_valid():
+                operations.append((instance, serializer.validated_data))
+                errors.append({})
+            else:
+                errors.append(serializer.errors)
+
+        # update한 뒤 같은 transaction에서 삭제하지 않도록 함
+        delete_errors = {
+            index: [_('Not found.')] if recipe_id not in instances
+            else [_('Also updated in recipes.')]
+            for index, recipe_id in enumerate(delete_ids)
+            if recipe_id not in instances or recipe_id in update_ids
+        }
+        if any(errors):
+            raise serializers.ValidationError({'recipes': errors})
+        if delete_errors:
+            raise serializers.ValidationError({'delete': delete_errors})
+
+        return {'operations': operations, 'delete': delete_ids}
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """Apply all changes in a single transaction"""
+        auth_user = self.context['request'].user
+        serializer = RecipeDetailSerializer(many=True, context=self.context)
+        operations = validated_data['operations']
+        recipes = serializer.save_all(
+            [instance for instance, attrs in operations],
+            [
+                attrs if instance is not None else {**attrs, 'user': auth_user}
+                for instance, attrs in operations
+            ],
+        )
+        Recipe.objects.filter(
+            user=auth_user,
+            id__in=validated_data['delete'],
+        ).delete()
+
+        return {'recipes': recipes, 'delete': validated_data['delete']}
+
+    def to_representation(self, instance):
+        """Return the saved recipes and the deleted recipe ids"""
+        # 응답을 만들 때 recipe마다 tags/ingredients를 조회하지 않도록
+        # 변경된 recipe를 한 번에 prefetch하여 다시 조회함
+        recipes = Recipe.objects.filter(
+            id__in=[recipe.id for recipe in instance['recipes']],
+        ).defer('search_vector').prefetch_related(
+            'tags', 'ingredients',
+        ).in_bulk()
+
+        return {
+            'recipes': RecipeDetailSerializer(
+                [
+                    recipes[recipe.id] for recipe in instance['recipes']
+                    if recipe.id in recipes
+                ],
+                many=True,
+                context=self.context,
+            ).data,
+            'deleted': instance['delete'],
+        }
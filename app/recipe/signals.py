@@ -0,0 +1,124 @@
+"""
+Signal handlers for the recipe app
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    post_save,
+    pre_delete,
+    post_delete,
+    m2m_changed,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+from recipe.cache import bump_user_version
+from recipe.pantry import (
+    bump_pantry_version,
+    pantry_indexes,
+)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Invalidate cached responses when a recipe, tag or ingredient changes"""
+    bump_user_version(instance.user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def touch_related_recipes(sender, instance, created=False, **kwargs):
+    """Mark recipes as updated when a related tag or ingredient changes"""
+    # tag/ingredient 이름은 recipe 응답에 포함되므로
+    # 연결된 recipe의 updated_at을 갱신하여 ETag가 바뀌도록 함
+    if not created:
+        instance.recipe_set.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_user_cache_on_m2m(sender, instance, action, **kwargs):
+    """Invalidate cached responses when recipe relations change"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_user_version(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_new_user_cache(sender, instance, created, **kwargs):
+    """Start a new user with a fresh cache version"""
+    # 삭제된 user의 id가 재사용되어도 예전 응답을 반환하지 않도록 함
+    if created:
+        bump_user_version(instance.pk)
+        bump_pantry_version(instance.pk)
+
+
+def apply_pantry_change(user_id, change):
+    """Apply a change to the pantry index once the transaction commits"""
+    # rollback된 변경이 index에 남지 않도록 commit 후에 적용함
+    transaction.on_commit(lambda: pantry_indexes.apply(user_id, change))
+
+
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_pantry_on_m2m(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Update the pantry index when recipe ingredients change"""
+    pk = instance.pk
+    if action == 'pre_clear':
+        if reverse:
+            apply_pantry_change(
+                instance.user_id,
+                lambda index: index.remove_ingredient(pk),
+            )
+        else:
+            apply_pantry_change(
+                instance.user_id,
+                lambda index: index.remove_recipe(pk),
+            )
+    elif action in ('post_add', 'post_remove') and pk_set:
+        pairs = [
+            (other_pk, pk) if reverse else (pk, other_pk)
+            for other_pk in pk_set
+        ]
+
+        def change(index):
+            for recipe_id, ingredient_id in pairs:
+                if action == 'post_add':
+                    index.add(recipe_id, ingredient_id)
+                else:
+                    index.remove(recipe_id, ingredient_id)
+
+        apply_pantry_change(instance.user_id, change)
+
+
+@receiver(post_delete, sender=Recipe)
+def update_pantry_on_recipe_delete(sender, instance, **kwargs):
+    """Remove a deleted recipe from the pantry index"""
+    # 삭제 후에는 instance.pk가 None이 되므로 미리 저장함
+    pk = instance.pk
+    apply_pantry_change(
+        instance.user_id,
+        lambda index: index.remove_recipe(pk),
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def update_pantry_on_ingredient_delete(sender, instance, **kwargs):
+    """Remove a deleted ingredient from the pantry index"""
+    # 삭제 후에는 instance.pk가 None이 되므로 미리 저장함
+    pk = instance.pk
+    apply_pantry_change(
+        instance.user_id,
+        lambda index: index.remove_ingredient(pk),
+    )
@@ -0,0 +1,33 @@
+"""
+Streaming responses for the recipe APIs
+"""
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+
+def stream_json_array(queryset, serializer_class, context, chunk_size):
+    """Yield a JSON array of serialized objects one chunk at a time"""
+    renderer = JSONRenderer()
+    # chunk_size를 지정한 iterator()는 chunk 단위로 prefetch_related를 실행함
+    objects = queryset.iterator(chunk_size=chunk_size)
+    separator = b'['
+    while True:
+        chunk = list(islice(objects, chunk_size))
+        if not chunk:
+            break
+        data = serializer_class(chunk, many=True, context=context).data
+        # 렌더링된 '[...]'에서 괄호를 떼어내고 이전 chunk 뒤에 이어 붙임
+        yield separator + renderer.render(data)[1:-1]
+        separator = b','
+    yield b'[]' if separator == b'[' else b']'
+
+
+def streaming_json_response(queryset, serializer_class, context,
+                            chunk_size=500):
+    """Return a response which writes a JSON array incrementally"""
+    return StreamingHttpResponse(
+        stream_json_array(queryset, serializer_class, context, chunk_size),
+        content_type='application/json',
+    )
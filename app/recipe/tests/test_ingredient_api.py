@@ -5,14 +5,19 @@ from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.test import TestCase
+from django.test import (
+    Client,
+    TestCase,
+)
 
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
 from core.models import (
     Ingredient,
     Recipe,)
+from core.tests.query_budget import check_queries
 
 from recipe.serializers import IngredientSerializer
 
@@ -27,6 +32,7 @@ def create_user(email='user@example.com', password='password123'):
     return get_user_model().objects.create_user(email=email, password=password)
 
 
+@check_queries()
 class PublicIngredientsApiTests(TestCase):
     """Test unauthenticated API requests"""
 
@@ -40,6 +46,7 @@ class PublicIngredientsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@check_queries()
 class PrivateIngredientsApiTests(TestCase):
     """Test authenticated API requests"""
 
@@ -58,7 +65,7 @@ class PrivateIngredientsApiTests(TestCase):
         ingredients = Ingredient.objects.all().order_by('-name')
         serializer = IngredientSerializer(ingredients, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """Test list of ingredients is limited to authenticated user"""
@@ -69,9 +76,9 @@ class PrivateIngredientsApiTests(TestCase):
         res = self.client.get(INGREDIENT_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ingredient.name)
-        self.assertEqual(res.data[0]['id'], ingredient.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ingredient.name)
+        self.assertEqual(res.data['results'][0]['id'], ingredient.id)
 
     def test_update_ingredient(self):
         """Test updating an infredient"""
@@ -112,8 +119,8 @@ class PrivateIngredientsApiTests(TestCase):
 
         s1 = IngredientSerializer(in1)
         s2 = IngredientSerializer(in2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
 
     def test_filtered_ingredients_unique(self):
         """Test filtered ingredients returns a unique list"""
@@ -136,5 +143,27 @@ class PrivateIngredientsApiTests(TestCase):
 
         res = self.client.get(INGREDIENT_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
 
+    def test_async_list_matches_sync_api(self):
+        """Test the async ingredient list returns the same ingredients"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=5,
+            price=Decimal('4.50'),
+        )
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='A'))
+        Ingredient.objects.create(user=self.user, name='B')
+        token = Token.objects.create(user=self.user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        for params in ({}, {'assigned_only': 1}):
+            res = client.get(reverse('recipe-async:ingredient-list'), params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                res.json()['results'],
+                self.client.get(INGREDIENT_URL, params).json()['results'],
+            )
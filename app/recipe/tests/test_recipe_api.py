@@ -1,27 +1,54 @@
 """
 Test for recipe APIs
 """
+from datetime import timedelta
 from decimal import Decimal
+from unittest.mock import patch
+import hashlib
+import json
+import random
 import tempfile
 import os
+import shutil
 
+from asgiref.sync import sync_to_async
 from PIL import Image
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import (
+    AsyncClient,
+    Client,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
 from core.models import (Recipe,
                          Tag,
                          Ingredient,)
-
+from core.tests.query_budget import (
+    assert_queries,
+    check_queries,
+)
+
+from recipe.filters import filter_by_related
+from recipe.images import variant_dir
+from recipe.pantry import PantryIndex
 from recipe.serializers import (RecipeSerializer,
                                 RecipeDetailSerializer,)
+from recipe.views import RecipeViewSet
 
 RECIPES_URL = reverse('recipe:recipe-list')
+BULK_URL = reverse('recipe:recipe-bulk')
+ASYNC_RECIPES_URL = reverse('recipe-async:recipe-list')
 
 
 def detail_url(recipe_id):
@@ -53,6 +80,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
+@check_queries()
 class PublicRecipeApiTest(TestCase):
     """Test unauthenticated API requests"""
 
@@ -66,6 +94,7 @@ class PublicRecipeApiTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@check_queries()
 class PrivateRecipeApiTests(TestCase):
     """Test authenticated API requests"""
 
@@ -84,7 +113,7 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
         """Test list of recipes is limited to authenticated user"""
@@ -100,7 +129,7 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_recipe_detail(self):
         """Test get_recipe_detail"""
@@ -378,6 +407,67 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.ingredients.count(), 0)
 
+    def test_create_recipe_with_duplicate_tags(self):
+        """Test repeated tag names in a payload create a single tag"""
+        payload = {
+            'title': 'Pongal',
+            'time_minutes': 60,
+            'price': Decimal('4.50'),
+            'tags': [{'name': 'Indian'}, {'name': 'Indian'}],
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(len(res.data['tags']), 1)
+
+    def test_update_recipe_tags_diff(self):
+        """Test updating tags only writes the changed through rows"""
+        recipe = create_recipe(user=self.user)
+        tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(20)
+        ]
+        recipe.tags.add(*tags)
+
+        payload = {
+            'tags': [{'name': tag.name} for tag in tags[1:]] +
+            [{'name': 'New Tag'}],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(
+                detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        writes = [
+            q['sql'] for q in ctx.captured_queries
+            if 'core_recipe_tags' in q['sql'] and
+            q['sql'].startswith(('INSERT', 'DELETE'))
+        ]
+        self.assertEqual(len(writes), 2)
+        self.assertNotIn(tags[0], recipe.tags.all())
+        self.assertEqual(recipe.tags.count(), 20)
+
+    def test_partial_update_saves_changed_fields(self):
+        """Test only changed columns are written on update"""
+        recipe = create_recipe(user=self.user, title='Sample recipe title')
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.patch(detail_url(recipe.id), {'title': 'New title'})
+        updates = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.patch(detail_url(recipe.id), {'title': 'New title'})
+        self.assertFalse(any(
+            q['sql'].startswith('UPDATE') for q in ctx.captured_queries
+        ))
+
     def test_filter_by_tags(self):
         """Test filtering recipes by tags"""
         r1 = create_recipe(user=self.user, title='Thai Vegetable Curry')
@@ -394,9 +484,9 @@ class PrivateRecipeApiTests(TestCase):
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_filter_by_ingredients(self):
         """Test filtering recipes by ingredients"""
@@ -414,9 +504,9 @@ class PrivateRecipeApiTests(TestCase):
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_filter_by_tags_and_ingredients(self):
         """Test filtering recipes by tags and ingredients"""
@@ -433,9 +523,930 @@ class PrivateRecipeApiTests(TestCase):
 
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
+
+    def test_list_paginated_by_cursor(self):
+        """Test recipes are returned in pages linked by cursors"""
+        recipes = [
+            create_recipe(user=self.user, title=f'Recipe {i}')
+            for i in range(5)
+        ]
+
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data['previous'])
+        ids = [item['id'] for item in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            ids += [item['id'] for item in res.data['results']]
+        self.assertEqual(ids, [r.id for r in reversed(recipes)])
+
+    def test_list_page_size_limited(self):
+        """Test page size can not exceed the maximum page size"""
+        create_recipe(user=self.user)
+
+        res = self.client.get(RECIPES_URL, {'page_size': 100000})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_list_invalid_cursor(self):
+        """Test an invalid cursor returns an error"""
+        res = self.client.get(RECIPES_URL, {'cursor': 'notacursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filter_by_all_tags(self):
+        """Test filtering recipes which have every given tag"""
+        r1 = create_recipe(user=self.user, title='Thai Vegetable Curry')
+        r2 = create_recipe(user=self.user, title='Aubergine with Tahini')
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Dinner')
+        r1.tags.add(tag1, tag2)
+        r2.tags.add(tag1)
+
+        params = {'tags': f'{tag1.id},{tag2.id}', 'match': 'all'}
+        res = self.client.get(RECIPES_URL, params)
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [r1.id])
+
+    def test_filter_invalid_match(self):
+        """Test an unknown match mode returns an error"""
+        res = self.client.get(RECIPES_URL, {'tags': '1', 'match': 'some'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_results_have_no_duplicates(self):
+        """Test a recipe matching several tags is returned once"""
+        recipe = create_recipe(user=self.user)
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Dinner')
+        recipe.tags.add(tag1, tag2)
+
+        res = self.client.get(RECIPES_URL, {'tags': f'{tag1.id},{tag2.id}'})
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_filter_equivalent_to_join(self):
+        """Test subquery filters return the same recipes as joins"""
+        rng = random.Random(0)
+        tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(6)
+        ]
+        for i in range(30):
+            recipe = create_recipe(user=self.user, title=f'Recipe {i}')
+            recipe.tags.add(*rng.sample(tags, rng.randint(0, 4)))
+        recipes = Recipe.objects.filter(user=self.user)
+
+        for _ in range(20):
+            ids = [tag.id for tag in rng.sample(tags, rng.randint(1, 3))]
+            joined_any = recipes.filter(tags__id__in=ids).distinct()
+            joined_all = recipes
+            for tag_id in ids:
+                joined_all = joined_all.filter(tags__id=tag_id)
+
+            self.assertEqual(
+                set(filter_by_related(recipes, 'tags', ids, 'any')),
+                set(joined_any),
+            )
+            self.assertEqual(
+                set(filter_by_related(recipes, 'tags', ids, 'all')),
+                set(joined_all),
+            )
+
+    @patch('recipe.views.RecipeViewSet.stream_chunk_size', 2)
+    def test_list_streamed(self):
+        """Test streaming every recipe as a JSON array"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        for i in range(5):
+            create_recipe(user=self.user, title=f'Recipe {i}').tags.add(tag)
+
+        res = self.client.get(RECIPES_URL, {'stream': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        data = json.loads(b''.join(res.streaming_content))
+        recipes = Recipe.objects.all().order_by('-id')
+        serializer = RecipeSerializer(recipes, many=True)
+        self.assertEqual(data, json.loads(json.dumps(serializer.data)))
+
+    def test_list_streamed_empty(self):
+        """Test streaming returns an empty array without recipes"""
+        res = self.client.get(RECIPES_URL, {'stream': 1})
+
+        self.assertEqual(json.loads(b''.join(res.streaming_content)), [])
+
+    def test_list_stream_invalid(self):
+        """Test an invalid stream flag returns an error"""
+        for value in ('true', 'abc', '2'):
+            res = self.client.get(RECIPES_URL, {'stream': value})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('stream', res.data)
+
+    def test_search_recipes(self):
+        """Test searching recipes by title, description, tags, ingredients"""
+        r1 = create_recipe(user=self.user, title='Kimchi soup')
+        r2 = create_recipe(
+            user=self.user,
+            title='Fried rice',
+            description='Quick kimchi fried rice',
+        )
+        r3 = create_recipe(user=self.user, title='Bean stew')
+        r3.tags.add(Tag.objects.create(user=self.user, name='Kimchi'))
+        r4 = create_recipe(user=self.user, title='Pork belly')
+        r4.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Kimchi'))
+        create_recipe(user=self.user, title='Fish and chips')
+
+        res = self.client.get(RECIPES_URL, {'search': 'kimchi'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids[0], r1.id)
+        self.assertEqual(set(ids), {r1.id, r2.id, r3.id, r4.id})
+
+    def test_search_matches_prefix_of_every_word(self):
+        """Test searching with partial words requires every word"""
+        r1 = create_recipe(user=self.user, title='Kimchi soup')
+        create_recipe(user=self.user, title='Kimchi fried rice')
+        create_recipe(user=self.user, title='Tomato soup')
+
+        res = self.client.get(RECIPES_URL, {'search': 'kimc sou'})
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [r1.id])
+
+    def test_search_without_words(self):
+        """Test a search without any words returns no recipes"""
+        create_recipe(user=self.user)
+
+        res = self.client.get(RECIPES_URL, {'search': '&|!:*'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
+
+    def test_search_paginated_by_rank(self):
+        """Test search results are paged in rank order"""
+        in_title = [
+            create_recipe(user=self.user, title=f'Curry {i}')
+            for i in range(3)
+        ]
+        in_description = [
+            create_recipe(
+                user=self.user,
+                title=f'Rice {i}',
+                description='Served with curry',
+            )
+            for i in range(3)
+        ]
+
+        res = self.client.get(
+            RECIPES_URL, {'search': 'curry', 'page_size': 2})
+        ids = [item['id'] for item in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            ids += [item['id'] for item in res.data['results']]
+
+        self.assertEqual(
+            ids,
+            [r.id for r in reversed(in_title)]
+            + [r.id for r in reversed(in_description)],
+        )
+
+
+@check_queries()
+class RecipeCacheTests(TestCase):
+    """Test caching of recipe list responses"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request does not query the database"""
+        create_recipe(user=self.user)
+        res1 = self.client.get(RECIPES_URL, {'tags': '1'})
+
+        with CaptureQueriesContext(connection) as ctx:
+            res2 = self.client.get(RECIPES_URL, {'tags': '1'})
+
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(res1.data, res2.data)
+
+    def test_cache_keyed_by_query_string(self):
+        """Test responses for different filters are cached separately"""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe.tags.add(tag)
+        create_recipe(user=self.user)
+
+        res1 = self.client.get(RECIPES_URL)
+        res2 = self.client.get(RECIPES_URL, {'tags': f'{tag.id}'})
+
+        self.assertEqual(len(res1.data['results']), 2)
+        self.assertEqual(len(res2.data['results']), 1)
+
+    def test_cache_invalidated_on_change(self):
+        """Test changing a recipe invalidates the cached list"""
+        recipe = create_recipe(user=self.user, title='Old title')
+        self.client.get(RECIPES_URL)
+
+        self.client.patch(detail_url(recipe.id), {'title': 'New title'})
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'][0]['title'], 'New title')
+
+    def test_cache_invalidated_on_tag_rename(self):
+        """Test renaming a tag invalidates the cached recipe list"""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe.tags.add(tag)
+        self.client.get(RECIPES_URL)
+
+        tag.name = 'Vegetarian'
+        tag.save()
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            res.data['results'][0]['tags'][0]['name'], 'Vegetarian')
+
+    def test_cache_invalidated_on_bulk(self):
+        """Test bulk changes invalidate the cached list"""
+        self.client.get(RECIPES_URL)
+        payload = {'recipes': [
+            {'title': 'Bulk', 'time_minutes': 10, 'price': '2.50'},
+        ]}
+
+        self.client.post(BULK_URL, payload, format='json')
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_cache_limited_to_user(self):
+        """Test cached responses are not shared between users"""
+        create_recipe(user=self.user)
+        self.client.get(RECIPES_URL)
+        other_user = create_user(email='other@example.com', password='pw123')
+        self.client.force_authenticate(other_user)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'], [])
+
+
+@check_queries()
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling of recipe responses"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+
+    def test_retrieve_not_modified(self):
+        """Test retrieving an unchanged recipe with its ETag returns 304"""
+        recipe = create_recipe(user=self.user)
+        res = self.client.get(detail_url(recipe.id))
+        self.assertIn('ETag', res)
+        self.assertIn('Last-Modified', res)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(
+                detail_url(recipe.id), HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_retrieve_etag_changes_on_title_update(self):
+        """Test changing only a column changes the recipe ETag"""
+        recipe = create_recipe(user=self.user)
+        etag = self.client.get(detail_url(recipe.id))['ETag']
+        updated_at = Recipe.objects.get(id=recipe.id).updated_at
+
+        self.client.patch(detail_url(recipe.id), {'title': 'Changed'})
+        res = self.client.get(detail_url(recipe.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'Changed')
+        recipe.refresh_from_db()
+        self.assertGreater(recipe.updated_at, updated_at)
+
+    def test_retrieve_invalid_id_not_found(self):
+        """Test retrieving a recipe by a non numeric id returns 404"""
+        res = self.client.get('/api/recipe/recipes/abc/')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_modified_since(self):
+        """Test If-Modified-Since is answered from updated_at"""
+        recipe = create_recipe(user=self.user)
+        res = self.client.get(detail_url(recipe.id))
+
+        res = self.client.get(
+            detail_url(recipe.id),
+            HTTP_IF_MODIFIED_SINCE=res['Last-Modified'],
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_etag_changes_on_tag_update(self):
+        """Test changing recipe tags changes the recipe ETag"""
+        recipe = create_recipe(user=self.user)
+        etag = self.client.get(detail_url(recipe.id))['ETag']
+
+        self.client.patch(
+            detail_url(recipe.id),
+            {'tags': [{'name': 'Vegan'}]},
+            format='json',
+        )
+        res = self.client.get(detail_url(recipe.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_list_not_modified(self):
+        """Test listing unchanged recipes with the ETag returns 304"""
+        create_recipe(user=self.user)
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_list_etag_changes_on_tag_rename(self):
+        """Test renaming a tag changes the list ETag"""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe.tags.add(tag)
+        etag = self.client.get(RECIPES_URL)['ETag']
+        updated_at = Recipe.objects.get(id=recipe.id).updated_at
+
+        tag.name = 'Vegetarian'
+        tag.save()
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe.refresh_from_db()
+        self.assertGreater(recipe.updated_at, updated_at)
+
+
+@check_queries()
+class BulkRecipeApiTests(TestCase):
+    """Test the bulk recipe API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create(self):
+        """Test creating many recipes with shared tags and ingredients"""
+        Tag.objects.create(user=self.user, name='Dinner')
+        payload = {'recipes': [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': 10,
+                'price': '2.50',
+                'tags': [{'name': 'Dinner'}, {'name': f'Tag {i % 3}'}],
+                'ingredients': [{'name': 'Salt'}],
+            }
+            for i in range(6)
+        ]}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['recipes']), 6)
+        self.assertEqual(res.data['recipes'][5]['title'], 'Recipe 5')
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 6)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 1)
+        recipe = Recipe.objects.get(id=res.data['recipes'][4]['id'])
+        self.assertEqual(
+            sorted(tag.name for tag in recipe.tags.all()),
+            ['Dinner', 'Tag 1'],
+        )
+        self.assertEqual(recipe.user, self.user)
+
+    def test_bulk_update_and_delete(self):
+        """Test updating and deleting recipes in one request"""
+        recipe = create_recipe(user=self.user, title='Old title')
+        deleted = create_recipe(user=self.user)
+        payload = {
+            'recipes': [{'id': recipe.id, 'title': 'New title'}],
+            'delete': [deleted.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['deleted'], [deleted.id])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'New title')
+        self.assertFalse(Recipe.objects.filter(id=deleted.id).exists())
+
+    def test_bulk_update_relations(self):
+        """Test bulk updates replace only the given relations"""
+        recipes = [create_recipe(user=self.user) for i in range(3)]
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        for recipe in recipes:
+            recipe.tags.add(Tag.objects.create(
+                user=self.user, name=f'Old {recipe.id}'))
+            recipe.ingredients.add(salt)
+        past = timezone.now() - timedelta(days=1)
+        Recipe.objects.update(updated_at=past)
+        payload = {'recipes': [
+            {'id': recipes[0].id, 'tags': [{'name': 'Dinner'}]},
+            {'id': recipes[1].id, 'title': 'Renamed'},
+            {
+                'id': recipes[2].id,
+                'tags': [{'name': f'Old {recipes[2].id}'}, {'name': 'Dinner'}],
+                'ingredients': [],
+            },
+        ]}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag.name for tag in recipes[0].tags.all()],
+            ['Dinner'],
+        )
+        self.assertEqual(list(recipes[0].ingredients.all()), [salt])
+        recipes[1].refresh_from_db()
+        self.assertEqual(recipes[1].title, 'Renamed')
+        self.assertEqual(
+            [tag.name for tag in recipes[1].tags.all()],
+            [f'Old {recipes[1].id}'],
+        )
+        self.assertEqual(
+            sorted(tag.name for tag in recipes[2].tags.all()),
+            sorted(['Dinner', f'Old {recipes[2].id}']),
+        )
+        self.assertFalse(recipes[2].ingredients.exists())
+        for recipe in recipes:
+            recipe.refresh_from_db()
+            self.assertGreater(recipe.updated_at, past)
+        self.assertEqual(res.data['recipes'][0]['tags'][0]['name'], 'Dinner')
+
+    def test_bulk_reports_errors_per_item(self):
+        """Test invalid items are reported and nothing is saved"""
+        other_recipe = create_recipe(
+            user=create_user(email='other@example.com', password='test123'),
+        )
+        payload = {'recipes': [
+            {'title': 'Valid', 'time_minutes': 10, 'price': '2.50'},
+            {'title': 'Missing price', 'time_minutes': 10},
+            {'id': other_recipe.id, 'title': 'Not mine'},
+        ]}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = res.data['recipes']
+        self.assertEqual(errors[0], {})
+        self.assertIn('price', errors[1])
+        self.assertIn('id', errors[2])
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    def test_bulk_update_id_validated(self):
+        """Test item ids are converted to integers or reported as errors"""
+        recipe = create_recipe(user=self.user, title='Old title')
+        payload = {'recipes': [
+            {'id': str(recipe.id), 'title': 'New title'},
+            {'id': [recipe.id], 'title': 'Invalid id'},
+        ]}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = res.data['recipes']
+        self.assertEqual(errors[0], {})
+        self.assertIn('id', errors[1])
+
+        res = self.client.post(BULK_URL, {'recipes': payload['recipes'][:1]},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'New title')
+
+    def test_bulk_repeated_update_error(self):
+        """Test a recipe can not be updated twice in one request"""
+        recipe = create_recipe(user=self.user, title='Old title')
+        payload = {'recipes': [
+            {'id': recipe.id, 'tags': [{'name': 'x'}]},
+            {'id': recipe.id, 'title': 'New title', 'tags': [{'name': 'y'}]},
+        ]}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = res.data['recipes']
+        self.assertEqual(errors[0], {})
+        self.assertIn('id', errors[1])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'Old title')
+        self.assertFalse(recipe.tags.exists())
+
+    def test_bulk_delete_other_users_recipe_error(self):
+        """Test deleting another users recipe in bulk gives an error"""
+        other_recipe = create_recipe(
+            user=create_user(email='other@example.com', password='test123'),
+        )
+
+        res = self.client.post(
+            BULK_URL, {'delete': [other_recipe.id]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Recipe.objects.filter(id=other_recipe.id).exists())
+
+    def test_bulk_update_and_delete_same_recipe_error(self):
+        """Test a recipe can not be updated and deleted in one request"""
+        recipe = create_recipe(user=self.user, title='Old title')
+        payload = {
+            'recipes': [{'id': recipe.id, 'title': 'New title'}],
+            'delete': [recipe.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(0, res.data['delete'])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'Old title')
+
+
+@check_queries()
+class PantryApiTests(TestCase):
+    """Test filtering recipes which can be cooked from a pantry"""
 
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+        self.ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ('Rice', 'Egg', 'Kimchi', 'Pork')
+        ]
+
+    def _create_recipe(self, *ingredients):
+        """Create a recipe using the given ingredients"""
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = create_recipe(user=self.user)
+            recipe.ingredients.add(*ingredients)
+
+        return recipe
+
+    def _pantry_ids(self, ingredients, **params):
+        """Return ids of the recipes cookable from the ingredients"""
+        params['pantry'] = ','.join(str(i.id) for i in ingredients)
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_filter_by_pantry(self):
+        """Test only recipes with every ingredient available are returned"""
+        rice, egg, kimchi, pork = self.ingredients
+        r1 = self._create_recipe(rice, egg)
+        r2 = self._create_recipe(rice, egg, kimchi)
+        self._create_recipe(pork)
+        self._create_recipe()
+
+        self.assertEqual(self._pantry_ids([rice, egg]), [r1.id])
+        self.assertEqual(
+            self._pantry_ids([rice, egg, kimchi]), [r2.id, r1.id])
+
+    def test_filter_by_pantry_max_missing(self):
+        """Test recipes missing a few ingredients are returned"""
+        rice, egg, kimchi, pork = self.ingredients
+        r1 = self._create_recipe(rice, egg)
+        r2 = self._create_recipe(rice, egg, kimchi)
+        r3 = self._create_recipe(kimchi, pork)
+
+        self.assertEqual(
+            self._pantry_ids([rice], max_missing=1), [r1.id])
+        self.assertEqual(
+            self._pantry_ids([rice], max_missing=2), [r3.id, r2.id, r1.id])
+
+    def test_filter_by_pantry_invalid_max_missing(self):
+        """Test a negative max_missing returns an error"""
+        res = self.client.get(
+            RECIPES_URL, {'pantry': '1', 'max_missing': '-1'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_by_pantry_invalid_ids(self):
+        """Test non-numeric pantry ids return an error"""
+        res = self.client.get(RECIPES_URL, {'pantry': '1,abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pantry', res.data)
+
+    def test_pantry_updated_on_change(self):
+        """Test the pantry index follows recipe and ingredient changes"""
+        rice, egg, kimchi, pork = self.ingredients
+        recipe = self._create_recipe(rice, egg)
+        self.assertEqual(self._pantry_ids([rice, egg]), [recipe.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.ingredients.add(kimchi)
+        self.assertEqual(self._pantry_ids([rice, egg]), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                detail_url(recipe.id),
+                {'ingredients': [{'name': 'Rice'}]},
+                format='json',
+            )
+        self.assertEqual(self._pantry_ids([rice]), [recipe.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rice.delete()
+        self.assertEqual(self._pantry_ids([egg]), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pork.recipe_set.add(recipe)
+        self.assertEqual(self._pantry_ids([pork]), [recipe.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+        self.assertEqual(self._pantry_ids([pork]), [])
+
+    def test_pantry_index_updated_incrementally(self):
+        """Test changes are applied to the index without rebuilding it"""
+        rice, egg, kimchi, pork = self.ingredients
+        recipe = self._create_recipe(rice)
+        self._pantry_ids([rice])
+
+        with patch('recipe.pantry.build_rows') as build_rows:
+            with self.captureOnCommitCallbacks(execute=True):
+                recipe.ingredients.add(egg)
+            ids = self._pantry_ids([rice, egg])
+
+        build_rows.assert_not_called()
+        self.assertEqual(ids, [recipe.id])
+
+    def test_pantry_updated_on_bulk(self):
+        """Test recipes created in bulk can be found from the pantry"""
+        self._pantry_ids([self.ingredients[0]])
+        payload = {'recipes': [{
+            'title': 'Rice bowl',
+            'time_minutes': 10,
+            'price': '2.50',
+            'ingredients': [{'name': 'Rice'}],
+        }]}
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(
+            self._pantry_ids([self.ingredients[0]]),
+            [res.data['recipes'][0]['id']],
+        )
+
+    def test_pantry_index_equivalent_to_query(self):
+        """Test the pantry index matches a brute force search"""
+        rng = random.Random(0)
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=f'Ingredient {i}')
+            for i in range(8)
+        ]
+        index = PantryIndex(version=0)
+        recipes = {}
+        for recipe_id in range(40):
+            recipes[recipe_id] = {
+                i.id for i in rng.sample(ingredients, rng.randint(0, 5))
+            }
+            for ingredient_id in recipes[recipe_id]:
+                index.add(recipe_id, ingredient_id)
+        for recipe_id in rng.sample(sorted(recipes), 10):
+            removed = set(rng.sample(sorted(recipes[recipe_id]),
+                                     len(recipes[recipe_id]) // 2))
+            for ingredient_id in removed:
+                index.remove(recipe_id, ingredient_id)
+            recipes[recipe_id] -= removed
+
+        for _ in range(30):
+            have = {i.id for i in rng.sample(ingredients, rng.randint(0, 8))}
+            max_missing = rng.randint(0, 3)
+            expected = {
+                recipe_id for recipe_id, needed in recipes.items()
+                if needed and len(needed - have) <= max_missing
+            }
+
+            self.assertEqual(set(index.match(have, max_missing)), expected)
+
+
+@check_queries()
+class RecipeQueryBudgetTests(TestCase):
+    """Test recipe endpoints stay within their declared query budgets"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+
+    def _create_recipes(self, count):
+        """Create recipes which each have a tag and an ingredient"""
+        recipes = []
+        for i in range(count):
+            recipe = create_recipe(user=self.user, title=f'Recipe {i}')
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f'Tag {recipe.id}'))
+            recipe.ingredients.add(Ingredient.objects.create(
+                user=self.user, name=f'Ing {recipe.id}'))
+            recipes.append(recipe)
+        return recipes
+
+    def assertWithinBudget(self, action, request, budget=None):
+        """Run request and check the queries it issues against the budget"""
+        if budget is None:
+            budget = RecipeViewSet.query_budgets[action]
+        with assert_queries(budget):
+            return request()
+
+    def test_list_queries_constant(self):
+        """Test listing recipes does not issue a query per recipe"""
+        self._create_recipes(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(RECIPES_URL)
+        self._create_recipes(10)
+
+        with CaptureQueriesContext(connection) as large:
+            res = self.assertWithinBudget(
+                'list', lambda: self.client.get(RECIPES_URL))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 12)
+        self.assertEqual(len(res.data['results'][0]['tags']), 1)
+        self.assertEqual(
+            len(small.captured_queries),
+            len(large.captured_queries),
+        )
+
+    def test_retrieve_within_budget(self):
+        """Test retrieving a recipe stays within budget"""
+        recipe = self._create_recipes(1)[0]
+
+        res = self.assertWithinBudget(
+            'retrieve', lambda: self.client.get(detail_url(recipe.id)))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['ingredients']), 1)
+
+    def test_create_within_budget(self):
+        """Test creating a recipe stays within budget"""
+        payload = {
+            'title': 'Sample Recipe',
+            'time_minutes': 30,
+            'price': Decimal('5.99'),
+        }
+
+        res = self.assertWithinBudget(
+            'create', lambda: self.client.post(RECIPES_URL, payload))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_create_with_nested_within_budget(self):
+        """Test nested tags and ingredients are written in batches"""
+        Tag.objects.create(user=self.user, name='Tag 0')
+        payload = {
+            'title': 'Sample Recipe',
+            'time_minutes': 30,
+            'price': Decimal('5.99'),
+            'tags': [{'name': f'Tag {i}'} for i in range(30)],
+            'ingredients': [{'name': f'Ing {i}'} for i in range(40)],
+        }
+
+        res = self.assertWithinBudget(
+            'create',
+            lambda: self.client.post(RECIPES_URL, payload, format='json'),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.tags.count(), 30)
+        self.assertEqual(recipe.ingredients.count(), 40)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 30)
+
+    def test_bulk_within_budget(self):
+        """Test bulk create issues a constant number of queries"""
+        deleted = self._create_recipes(3)
+        payload = {
+            'recipes': [
+                {
+                    'title': f'Recipe {i}',
+                    'time_minutes': 10,
+                    'price': '2.50',
+                    'tags': [{'name': f'Tag {i}'}],
+                    'ingredients': [{'name': f'Ing {i}'}],
+                }
+                for i in range(50)
+            ],
+            'delete': [recipe.id for recipe in deleted],
+        }
+
+        res = self.assertWithinBudget(
+            'bulk',
+            lambda: self.client.post(BULK_URL, payload, format='json'),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 50)
+
+    def test_bulk_update_queries_constant(self):
+        """Test bulk update does not issue queries per updated recipe"""
+        def bulk_update(recipes):
+            payload = {'recipes': [
+                {
+                    'id': recipe.id,
+                    'title': f'Updated {recipe.id}',
+                    'tags': [{'name': f'New {recipe.id}'}],
+                }
+                for recipe in recipes
+            ] + [
+                {'title': 'New', 'time_minutes': 10, 'price': '2.50'}
+                for i in range(3)
+            ]}
+            with CaptureQueriesContext(connection) as queries:
+                res = self.assertWithinBudget(
+                    'bulk',
+                    lambda: self.client.post(BULK_URL, payload, format='json'),
+                )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        small = bulk_update(self._create_recipes(1))
+        large = bulk_update(self._create_recipes(20))
+
+        self.assertEqual(small, large)
+        recipe = Recipe.objects.filter(title__startswith='Updated').last()
+        self.assertEqual(
+            [tag.name for tag in recipe.tags.all()],
+            [f'New {recipe.id}'],
+        )
+
+    def test_update_within_budget(self):
+        """Test updating a recipe stays within budget"""
+        recipe = self._create_recipes(1)[0]
+        payload = {'title': 'New recipe title'}
+
+        # nested field를 바꾸지 않으면 action의 budget보다 훨씬 적음
+        res = self.assertWithinBudget(
+            'partial_update',
+            lambda: self.client.patch(detail_url(recipe.id), payload),
+            budget=8,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 1)
+
+    def test_update_nested_within_budget(self):
+        """Test replacing tags and ingredients stays within budget"""
+        recipe = self._create_recipes(1)[0]
+        payload = {
+            'tags': [{'name': f'New tag {i}'} for i in range(20)],
+            'ingredients': [{'name': f'New ing {i}'} for i in range(20)],
+        }
+
+        res = self.assertWithinBudget(
+            'partial_update',
+            lambda: self.client.patch(
+                detail_url(recipe.id), payload, format='json'),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 20)
+        self.assertEqual(recipe.ingredients.count(), 20)
+
+    def test_delete_within_budget(self):
+        """Test deleting a recipe stays within budget"""
+        recipe = self._create_recipes(1)[0]
+
+        res = self.assertWithinBudget(
+            'destroy', lambda: self.client.delete(detail_url(recipe.id)))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+VARIANTS_INLINE = {
+    'WORKERS': 0,
+    'QUALITY': 80,
+    'SIZES': {'thumbnail': 4, 'large': 8},
+}
+
+
+@override_settings(RECIPE_IMAGE_VARIANTS=VARIANTS_INLINE)
+@check_queries()
 class ImageUploadTests(TestCase):
     """Tests for the image upload API"""
 
@@ -449,8 +1460,25 @@ class ImageUploadTests(TestCase):
         self.recipe = create_recipe(user=self.user)
 
     def tearDown(self):
+        if self.recipe.image:
+            shutil.rmtree(
+                self.recipe.image.storage.path(
+                    variant_dir(self.recipe.image.name)),
+                ignore_errors=True,
+            )
         self.recipe.image.delete()
 
+    def _upload(self, size=(10, 10)):
+        """Upload a JPEG image to the recipe"""
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            Image.new('RGB', size).save(image_file, format='JPEG')
+            image_file.seek(0)
+            return self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': image_file},
+                format='multipart',
+            )
+
     def test_upload_image(self):
         """Test uploading an image to a recipe"""
         url = image_upload_url(self.recipe.id)
@@ -470,10 +1498,391 @@ class ImageUploadTests(TestCase):
         self.assertIn('image', res.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    def test_upload_image_extension_from_format(self):
+        """Test the stored extension comes from the detected format"""
+        with tempfile.NamedTemporaryFile(suffix='.html') as image_file:
+            Image.new('RGB', (10, 10)).save(image_file, format='PNG')
+            image_file.seek(0)
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': image_file},
+                format='multipart',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertTrue(self.recipe.image.name.endswith('.png'))
+
     def test_upload_image_bad_request(self):
         """Test uploading invalid image"""
         url = image_upload_url(self.recipe.id)
         payload = {'image': 'notanimage'}
         res = self.client.post(url, payload, format='multipart')
 
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_image_generates_variants(self):
+        """Test resized JPEG and WebP variants are created"""
+        res = self._upload(size=(20, 10))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        storage = self.recipe.image.storage
+        directory = variant_dir(self.recipe.image.name)
+        for size, pixels in VARIANTS_INLINE['SIZES'].items():
+            self.assertTrue(
+                res.data['image_variants'][size]['webp'].endswith(
+                    f'{directory}/{size}.webp'))
+            for ext, fmt in (('jpg', 'JPEG'), ('webp', 'WEBP')):
+                with Image.open(
+                    storage.path(f'{directory}/{size}.{ext}')
+                ) as img:
+                    self.assertEqual(img.format, fmt)
+                    self.assertEqual(img.size, (pixels, pixels // 2))
+
+    @patch('recipe.views.queue_variants')
+    def test_original_served_until_variants_ready(self, queue_variants):
+        """Test variant URLs point to the original before generation"""
+        res = self._upload()
+
+        queue_variants.assert_called_once()
+        for formats in res.data['image_variants'].values():
+            self.assertEqual(set(formats.values()), {res.data['image']})
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(
+            res.data['image_variants']['thumbnail']['jpg'],
+            res.data['image'],
+        )
+
+    def test_upload_same_image_stored_once(self):
+        """Test the same image uploaded to two recipes shares one file"""
+        other = create_recipe(user=self.user)
+        self._upload()
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            Image.new('RGB', (10, 10)).save(image_file, format='JPEG')
+            image_file.seek(0)
+            res = self.client.post(
+                image_upload_url(other.id),
+                {'image': image_file},
+                format='multipart',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(other.image.name, self.recipe.image.name)
+        digest = os.path.splitext(os.path.basename(other.image.name))[0]
+        with open(other.image.path, 'rb') as stored:
+            self.assertEqual(hashlib.sha256(stored.read()).hexdigest(), digest)
+
+    def test_recipe_without_image_has_no_variants(self):
+        """Test a recipe without an image has no variant URLs"""
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertIsNone(res.data['image_variants'])
+
+
+@check_queries()
+class BoundedImageUploadTests(TestCase):
+    """Tests for the limits of streamed image uploads"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+        self.temp_dir = tempfile.mkdtemp()
+        limits = {
+            'MAX_BYTES': 50 * 1024,
+            'MAX_DIMENSION': 1000,
+            'MAX_PIXELS': 500 * 500,
+            'TEMP_DIR': self.temp_dir,
+        }
+        settings = override_settings(
+            RECIPE_IMAGE_UPLOAD=limits,
+            RECIPE_IMAGE_VARIANTS=VARIANTS_INLINE,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        if self.recipe.image:
+            shutil.rmtree(
+                self.recipe.image.storage.path(
+                    variant_dir(self.recipe.image.name)),
+                ignore_errors=True,
+            )
+            self.recipe.image.delete()
+
+    def _upload(self, img, fmt='PNG'):
+        """Upload an image to the recipe"""
+        with tempfile.NamedTemporaryFile(suffix='.img') as image_file:
+            img.save(image_file, format=fmt)
+            image_file.seek(0)
+            return self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': image_file},
+                format='multipart',
+            )
+
+    @patch('recipe.views.queue_variants')
+    @patch('PIL.ImageFile.ImageFile.load')
+    def test_upload_checks_header_only(self, load, queue_variants):
+        """Test an accepted upload is not decoded and leaves no temp file"""
+        res = self._upload(Image.new('RGB', (400, 300)))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        load.assert_not_called()
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_upload_too_many_bytes(self):
+        """Test an upload larger than the byte limit is rejected"""
+        img = Image.frombytes('RGB', (200, 200), os.urandom(3 * 200 * 200))
+
+        res = self._upload(img)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+
+    def test_upload_too_many_pixels(self):
+        """Test an image with too many pixels is rejected"""
+        res = self._upload(Image.new('RGB', (600, 600)))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data['image'], ['The image has too many pixels.'])
+
+    def test_upload_too_wide(self):
+        """Test an image with a side over the limit is rejected"""
+        res = self._upload(Image.new('RGB', (1200, 10)))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_not_an_image(self):
+        """Test a file which is not an image is rejected"""
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as upload:
+            upload.write(b'not an image' * 100)
+            upload.seek(0)
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': upload},
+                format='multipart',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@check_queries()
+class RecipeImageMediaTests(TestCase):
+    """Tests for serving recipe images through the media endpoint"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=media_root,
+            MEDIA_ACCEL_REDIRECT=True,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+        self.recipe.image.save('image.jpg', ContentFile(b'image bytes'))
+
+    def test_image_redirected_to_proxy(self):
+        """Test the owner gets an X-Accel-Redirect to the image"""
+        res = self.client.get(self.recipe.image.url, HTTP_ACCEPT='image/*')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res['X-Accel-Redirect'],
+            f'/protected/media/{self.recipe.image.name}',
+        )
+        self.assertEqual(res['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', res['Cache-Control'])
+        self.assertEqual(res.content, b'')
+
+    def test_variant_redirected_to_proxy(self):
+        """Test the owner can get the variants of the image"""
+        name = f'{variant_dir(self.recipe.image.name)}/small.webp'
+
+        res = self.client.get(f'/api/media/{name}')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Accel-Redirect'], f'/protected/media/{name}')
+        self.assertEqual(res['Content-Type'], 'image/webp')
+
+    def test_non_image_extension_not_rendered(self):
+        """Test a file stored with another extension is not served as it"""
+        self.recipe.image.save('image.html', ContentFile(b'<script>'))
+
+        res = self.client.get(self.recipe.image.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/octet-stream')
+        self.assertEqual(res['Content-Disposition'], 'attachment')
+        self.assertEqual(res['X-Content-Type-Options'], 'nosniff')
+
+    def test_image_served_without_proxy(self):
+        """Test the file is returned directly when the proxy is not used"""
+        with override_settings(MEDIA_ACCEL_REDIRECT=False):
+            res = self.client.get(self.recipe.image.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Accel-Redirect', res)
+        self.assertEqual(b''.join(res.streaming_content), b'image bytes')
+
+    def test_other_users_image_not_found(self):
+        """Test an image of another user's recipe is not served"""
+        other = create_user(email='other@example.com', password='test123')
+        self.client.force_authenticate(other)
+
+        res = self.client.get(self.recipe.image.url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_image_requires_auth(self):
+        """Test an unauthenticated request is rejected"""
+        res = APIClient().get(self.recipe.image.url)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_path_traversal_not_found(self):
+        """Test a path leaving the variant directory is rejected"""
+        name = (
+            f'{variant_dir(self.recipe.image.name)}/../../../../etc/passwd')
+
+        res = self.client.get(f'/api/media/{name}')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@check_queries()
+class AsyncRecipeApiTests(TestCase):
+    """Tests for the async recipe API"""
+
+    def setUp(self):
+        self.user = create_user(email='user@example.com', password='test123')
+        self.token = Token.objects.create(user=self.user)
+        self.client = Client(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.user)
+
+    def test_auth_required(self):
+        """Test auth is required with the same error as the sync API"""
+        res = Client().get(ASYNC_RECIPES_URL)
+        sync_res = APIClient().get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+        self.assertEqual(res.json(), sync_res.json())
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is rejected"""
+        res = Client(HTTP_AUTHORIZATION='Token invalid').get(
+            ASYNC_RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_matches_sync_api(self):
+        """Test filtered lists match the results of the sync API"""
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Quick')
+        ingredient = Ingredient.objects.create(user=self.user, name='Tofu')
+        for i in range(4):
+            recipe = create_recipe(user=self.user, title=f'Tofu bowl {i}')
+            recipe.tags.add(*[tag1, tag2][:i % 3])
+            if i % 2:
+                recipe.ingredients.add(ingredient)
+        create_recipe(user=create_user(email='other@example.com'))
+
+        for params in (
+            {},
+            {'tags': f'{tag1.id},{tag2.id}', 'match': 'all'},
+            {'ingredients': f'{ingredient.id}'},
+            {'search': 'bowl'},
+            {'pantry': f'{ingredient.id}', 'max_missing': '0'},
+        ):
+            res = self.client.get(ASYNC_RECIPES_URL, params)
+            sync_res = self.sync_client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                res.json()['results'], sync_res.json()['results'])
+
+    def test_invalid_params_rejected(self):
+        """Test invalid filter parameters return 400"""
+        res = self.client.get(ASYNC_RECIPES_URL, {'match': 'some'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('match', res.json())
+
+        res = self.client.get(ASYNC_RECIPES_URL, {'pantry': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pantry', res.json())
+
+    def test_list_paginated(self):
+        """Test the cursor links walk every recipe once"""
+        recipes = [create_recipe(user=self.user) for _ in range(5)]
+
+        ids = []
+        url = f'{ASYNC_RECIPES_URL}?page_size=2'
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(recipe['id'] for recipe in data['results'])
+            url = data['next']
+
+        self.assertEqual(ids, [r.id for r in reversed(recipes)])
+
+    def test_retrieve_recipe(self):
+        """Test retrieving a recipe matches the sync API"""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        url = reverse('recipe-async:recipe-detail', args=[recipe.id])
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json(), self.sync_client.get(detail_url(recipe.id)).json())
+
+    def test_retrieve_other_users_recipe_not_found(self):
+        """Test recipes of other users are not returned"""
+        recipe = create_recipe(user=create_user(email='other@example.com'))
+        url = reverse('recipe-async:recipe-detail', args=[recipe.id])
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_list_with_async_client(self):
+        """Test the list runs in the event loop without sync ORM calls"""
+        # sync ORM을 event loop에서 호출하면 SynchronousOnlyOperation이 발생함
+        recipe = await Recipe.objects.acreate(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=5,
+            price=Decimal('4.50'),
+        )
+        tag = await Tag.objects.acreate(user=self.user, name='Vegan')
+        await sync_to_async(recipe.tags.add)(tag)
+
+        res = await AsyncClient().get(
+            ASYNC_RECIPES_URL,
+            AUTHORIZATION=f'Token {self.token.key}',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.json()['results']
+        self.assertEqual([r['id'] for r in results], [recipe.id])
+        self.assertEqual(results[0]['tags'], [{'id': tag.id, 'name': 'Vegan'}])
@@ -5,14 +5,19 @@ from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.test import TestCase
+from django.test import (
+    Client,
+    TestCase,
+)
 
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
 from core.models import (
     Tag,
     Recipe,)
+from core.tests.query_budget import check_queries
 
 from recipe.serializers import TagSerializer
 
@@ -27,6 +32,7 @@ def create_user(email='user@example.com', password='testpassword123'):
     return get_user_model().objects.create_user(email, password)
 
 
+@check_queries()
 class PublicTagsApiTests(TestCase):
     """Test unauthenticated API requests"""
 
@@ -40,6 +46,7 @@ class PublicTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@check_queries()
 class PrivateTagsApiTests(TestCase):
     """Test authenticated API requests"""
 
@@ -59,7 +66,7 @@ class PrivateTagsApiTests(TestCase):
         serializer = TagSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test list of tags is limited to authenticated user"""
@@ -70,9 +77,9 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
-        self.assertEqual(res.data[0]['id'], tag.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
+        self.assertEqual(res.data['results'][0]['id'], tag.id)
 
     def test_update_tag(self):
         """Test updating a tag"""
@@ -86,6 +93,17 @@ class PrivateTagsApiTests(TestCase):
         tag.refresh_from_db()
         self.assertEqual(tag.name, payload['name'])
 
+    def test_update_tag_duplicate_name(self):
+        """Test renaming a tag to an existing name returns an error"""
+        Tag.objects.create(user=self.user, name='Dessert')
+        tag = Tag.objects.create(user=self.user, name='After Dinner')
+
+        res = self.client.patch(detail_url(tag.id), {'name': 'Dessert'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'After Dinner')
+
     def test_delete_tag(self):
         """Test deleting a tag"""
         tag = Tag.objects.create(user=self.user, name='Breakfast')
@@ -113,8 +131,8 @@ class PrivateTagsApiTests(TestCase):
 
         s1 = TagSerializer(tag1)
         s2 = TagSerializer(tag2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
 
     def test_filtered_tags_unique(self):
         """Test filtered tags returns a unique list"""
@@ -137,4 +155,39 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
\ No newline at end of file
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_tags_paginated_by_name(self):
+        """Test tags are paginated in descending name order"""
+        for name in ['Breakfast', 'Lunch', 'Dinner']:
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAGS_URL, {'page_size': 2})
+        names = [tag['name'] for tag in res.data['results']]
+        res = self.client.get(res.data['next'])
+        names += [tag['name'] for tag in res.data['results']]
+
+        self.assertEqual(names, ['Lunch', 'Dinner', 'Breakfast'])
+        self.assertIsNone(res.data['next'])
+
+    def test_async_list_matches_sync_api(self):
+        """Test the async tag list returns the same tags"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=5,
+            price=Decimal('4.50'),
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name='A'))
+        Tag.objects.create(user=self.user, name='B')
+        token = Token.objects.create(user=self.user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        for params in ({}, {'assigned_only': 1}):
+            res = client.get(reverse('recipe-async:tag-list'), params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                res.json()['results'],
+                self.client.get(TAGS_URL, params).json()['results'],
+            )
@@ -0,0 +1,199 @@
+"""
+Bounded-memory handling of recipe image uploads
+"""
+import hashlib
+import io
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    TemporaryUploadedFile,
+    UploadedFile,
+)
+from django.core.files.uploadhandler import (
+    StopUpload,
+    TemporaryFileUploadHandler,
+)
+from django.http.multipartparser import (
+    MultiPartParser as DjangoMultiPartParser,
+    MultiPartParserError,
+)
+from PIL import (
+    Image,
+    UnidentifiedImageError,
+)
+from rest_framework.exceptions import (
+    ParseError,
+    ValidationError,
+)
+from rest_framework.parsers import (
+    DataAndFiles,
+    MultiPartParser,
+)
+
+from core.storage import DIGEST_ATTR
+
+# 허용하는 format과 저장할 때 사용하는 확장자
+IMAGE_EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'WEBP': '.webp',
+    'GIF': '.gif',
+}
+ALLOWED_FORMATS = tuple(IMAGE_EXTENSIONS)
+
+
+class ImageRejected(Exception):
+    """Raised when an uploaded image is not accepted"""
+
+
+def read_image_header(file):
+    """Return the format and size of an image, reading only its header"""
+    # Image.open은 header만 읽고 bitmap은 decode하지 않음
+    try:
+        with Image.open(file) as img:
+            return img.format, img.size
+    except Image.DecompressionBombError:
+        raise ImageRejected('The image has too many pixels.')
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise ImageRejected(
+            'Upload a valid image. The file you uploaded was either not an '
+            'image or a corrupted image.')
+    finally:
+        file.seek(0)
+
+
+def check_image_header(fmt, size):
+    """Reject image formats and sizes which are not accepted"""
+    limits = settings.RECIPE_IMAGE_UPLOAD
+    width, height = size
+    if fmt not in ALLOWED_FORMATS:
+        raise ImageRejected(f'Unsupported image format: {fmt}.')
+    if max(width, height) > limits['MAX_DIMENSION']:
+        raise ImageRejected(
+            f"Image sides can be at most {limits['MAX_DIMENSION']} pixels.")
+    if width * height > limits['MAX_PIXELS']:
+        raise ImageRejected('The image has too many pixels.')
+
+
+def validate_image(file):
+    """Check an uploaded file is an accepted image and return its format"""
+    fmt, size = read_image_header(file)
+    check_image_header(fmt, size)
+
+    return fmt
+
+
+class MediaTemporaryUploadedFile(TemporaryUploadedFile):
+    """Temporary upload file created in a given directory"""
+    # MEDIA_ROOT와 같은 file system에 만들면 저장할 때 복사 대신 rename 됨
+
+    def __init__(self, name, content_type, size, charset, directory,
+                 content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        os.makedirs(directory, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext,
+            dir=directory,
+        )
+        UploadedFile.__init__(
+            self, file, name, content_type, size, charset, content_type_extra)
+
+
+class BoundedImageUploadHandler(TemporaryFileUploadHandler):
+    """Stream an image upload to disk and reject it as soon as it is too big"""
+    # chunk를 받는 대로 file에 쓰면서 sha256 digest도 계산함
+    header_size = 64 * 1024
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.limits = settings.RECIPE_IMAGE_UPLOAD
+        self.error = None
+        self._header = b''
+
+    def _reject(self, message):
+        """Stop reading the request body"""
+        self.error = message
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        """Reject requests whose body is too large before reading it"""
+        # multipart boundary와 header가 들어갈 여유를 둠
+        if content_length > self.limits['MAX_BYTES'] + self.header_size:
+            self._reject('The file is too large.')
+
+    def new_file(self, *args, **kwargs):
+        """Create the temporary file under the upload directory"""
+        super(TemporaryFileUploadHandler, self).new_file(*args, **kwargs)
+        self._header = b''
+        self._sha256 = hashlib.sha256()
+        self.file = MediaTemporaryUploadedFile(
+            self.file_name,
+            self.content_type,
+            0,
+            self.charset,
+            self.limits['TEMP_DIR'],
+            self.content_type_extra,
+        )
+
+    def _check_header(self):
+        """Reject the upload early when the header shows it is too big"""
+        header, self._header = self._header, None
+        try:
+            fmt, size = read_image_header(io.BytesIO(header))
+        except ImageRejected:
+            # header가 chunk보다 길 수 있으므로 저장 후 serializer에서 다시 검사함
+            return
+        try:
+            check_image_header(fmt, size)
+        except ImageRejected as exc:
+            self._reject(str(exc))
+
+    def receive_data_chunk(self, raw_data, start):
+        """Write the chunk to disk, checking the size and the header"""
+        if start + len(raw_data) > self.limits['MAX_BYTES']:
+            self._reject('The file is too large.')
+        if self._header is not None:
+            self._header += raw_data
+            if len(self._header) >= self.header_size:
+                self._check_header()
+        # 저장할 때 file을 다시 읽지 않도록 받으면서 digest를 계산함
+        self._sha256.update(raw_data)
+
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        """Check the header of files smaller than the header size"""
+        if self._header is not None:
+            self._check_header()
+        setattr(self.file, DIGEST_ATTR, self._sha256.hexdigest())
+
+        return super().file_complete(file_size)
+
+
+class BoundedImageParser(MultiPartParser):
+    """Multipart parser which streams image uploads with bounded memory"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the body with BoundedImageUploadHandler"""
+        parser_context = parser_context or {}
+        request = parser_context['request']
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta['CONTENT_TYPE'] = media_type
+        handler = BoundedImageUploadHandler(request)
+
+        try:
+            data, files = DjangoMultiPartParser(
+                meta, stream, [handler], encoding).parse()
+        except StopUpload:
+            # handle_raw_input에서 거절한 경우 Django parser가 처리하지 않음
+            data, files = None, None
+        except MultiPartParserError as exc:
+            raise ParseError('Multipart form parse error - %s' % str(exc))
+        if handler.error:
+            raise ValidationError({'image': [handler.error]})
+
+        return DataAndFiles(data, files)
@@ -1,6 +1,8 @@
 """
 Views for the recipe APIs
 """
+import os
+
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -8,22 +10,61 @@ from drf_spectacular.utils import (
     OpenApiTypes,
 )
 
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    transaction,
+)
+from django.http import (
+    FileResponse,
+    HttpResponse,
+)
 from rest_framework import (
     viewsets,
     mixins,
     status,
     )
 from rest_framework.decorators import action
+from rest_framework.exceptions import (
+    NotFound,
+    ValidationError,
+)
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 
+from core.authentication import CachedTokenAuthentication
 from core.models import (
     Recipe,
     Tag,
     Ingredient,
     )
 from recipe import serializers
+from recipe.cache import (
+    CachedListMixin,
+    ConditionalGetMixin,
+    bump_user_version,
+)
+from recipe.filters import (
+    filter_assigned,
+    filter_recipes,
+    parse_pantry,
+)
+from recipe.images import (
+    queue_variants,
+    source_lookup,
+)
+from recipe.pagination import (
+    RecipeCursorPagination,
+    RecipeAttrCursorPagination,
+)
+from recipe.pantry import (
+    bump_pantry_version,
+    pantry_indexes,
+)
+from recipe.streaming import streaming_json_response
+from recipe.uploads import BoundedImageParser
 
 @extend_schema_view(
     list=extend_schema(
@@ -37,38 +78,82 @@ from recipe import serializers
                 'ingredients',
                 OpenApiTypes.STR,
                 description='Comma separated list of ingredient IDs to filter',
-            )
+            ),
+            OpenApiParameter(
+                'match',
+                OpenApiTypes.STR, enum=['any', 'all'],
+                description='Match recipes with any or all of the given IDs',
+            ),
+            OpenApiParameter(
+                'pantry',
+                OpenApiTypes.STR,
+                description='Comma separated list of ingredient IDs you have '
+                            'to filter recipes you can cook',
+            ),
+            OpenApiParameter(
+                'max_missing',
+                OpenApiTypes.INT,
+                description='Number of ingredients a pantry recipe may miss',
+            ),
+            OpenApiParameter(
+                'search',
+                OpenApiTypes.STR,
+                description='Words to search in titles, descriptions, '
+                            'tags and ingredients, ordered by rank',
+            ),
+            OpenApiParameter(
+                'stream',
+                OpenApiTypes.INT, enum=[0, 1],
+                description='Stream every recipe as an unpaginated JSON array',
+            ),
         ]
     )
 )
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ConditionalGetMixin,
+                    CachedListMixin,
+                    viewsets.ModelViewSet):
     """View for manage recipe APIs"""
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
-
-    def _params_to_ints(self, qs):
-        """Conver a list of strings to integers"""
-        return [int(str_id) for str_id in qs.split(',')]
+    pagination_class = RecipeCursorPagination
+    stream_chunk_size = 500
+    # 각 action이 실행할 수 있는 최대 SQL query 수
+    # test suite에서 검사하여 N+1 query가 다시 생기면 CI가 실패하도록 함
+    # list는 pantry index를 처음 만들 때, update는 tags와 ingredients를
+    # 모두 바꿀 때가 최대이며 nested item 수와 관계없이 일정함
+    query_budgets = {
+        'list': 4,
+        'retrieve': 4,
+        'create': 15,
+        'update': 22,
+        'partial_update': 22,
+        'destroy': 6,
+        'bulk': 21,
+    }
 
     def get_queryset(self):
         """Retrieve recipes for authenticated user"""
         # 모든 list를 반환하지 않고,
         # 요청한 사용자와 관련된 list만 반환하도록 get_queryset를 오버라이딩함
-        tags = self.request.query_params.get('tags')
-        ingredients = self.request.query_params.get('ingredients')
-        queryset = self.queryset
-        if tags:
-            tags_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tags_ids)
-        if ingredients:
-            ingredients_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredients_ids)
+        params = self.request.query_params
+        pantry = parse_pantry(params)
+        pantry_ids = None
+        if pantry is not None:
+            # through table을 집계하지 않고 worker 안의 index로 recipe id를 찾음
+            pantry_ids = pantry_indexes.match(self.request.user.pk, *pantry)
+        queryset = filter_recipes(self.queryset, params, pantry_ids)
 
+        # nested serializer가 recipe마다 tags/ingredients를 조회하지 않도록
+        # prefetch하여 recipe 수와 관계없이 query 수를 일정하게 유지함
+        # 응답에 없는 search_vector는 읽지 않음
         return queryset.filter(
             user=self.request.user
-        ).order_by('-id').distinct()
+        ).defer('search_vector').prefetch_related(
+            'tags',
+            'ingredients',
+        )
 
     def get_serializer_class(self):
         """Return the serializer class for request"""
@@ -82,14 +167,51 @@ class RecipeViewSet(viewsets.ModelViewSet):
             #viewset에 get_serializer_class()에서 사용할 수 있는 action이 정의되어 있음
             #정의되어 있지 않은 action은 action 모듈을 Import하여 새롭게 정의해야 함
             return serializers.RecipeImageSerializer
+        elif self.action == 'bulk':
+            return serializers.RecipeBulkSerializer
 
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        """List recipes, streaming them when requested"""
+        # stream=1이면 전체 목록을 한 번에 메모리에 올리지 않고
+        # chunk 단위로 조회하여 JSON array를 조금씩 응답함
+        stream = request.query_params.get('stream', '0')
+        if stream not in ('0', '1'):
+            raise ValidationError({'stream': ['Must be 0 or 1.']})
+        if stream == '1':
+            return streaming_json_response(
+                self.filter_queryset(self.get_queryset()),
+                self.get_serializer_class(),
+                self.get_serializer_context(),
+                chunk_size=self.stream_chunk_size,
+            )
+
+        return super().list(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new recipe"""
         serializer.save(user=self.request.user)
 
-    @action(methods=['POST'], detail=True, url_path='upload-image')
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """Create, update and delete recipes in a single request"""
+        # recipe마다 POST를 보내는 대신 한 transaction 안에서 batch insert로 처리함
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        # bulk insert는 signal을 발생시키지 않으므로 직접 cache를 무효화함
+        bump_user_version(request.user.pk)
+        bump_pantry_version(request.user.pk)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        methods=['POST'],
+        detail=True,
+        url_path='upload-image',
+        parser_classes=[BoundedImageParser],
+    )
     # viewset은 사전에 정의된 url_path가 있기 때문에 request로 입력되는 endpoint와 action을 연결하기 위해
     # url_path를 지정해주어야 함
     def upload_image(self, request, pk=None):
@@ -98,7 +220,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(recipe, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            recipe = serializer.save()
+            # 원본을 저장한 뒤 크기별 JPEG/WebP variant는 process pool에서 만듦
+            queue_variants(recipe)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -115,26 +239,36 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ]
     )
 )
-class BaseRecipeAttrViewSet(mixins.ListModelMixin,
-                 mixins.UpdateModelMixin,
-                 mixins.DestroyModelMixin,
-                 viewsets.GenericViewSet):
+class BaseRecipeAttrViewSet(CachedListMixin,
+                            mixins.ListModelMixin,
+                            mixins.UpdateModelMixin,
+                            mixins.DestroyModelMixin,
+                            viewsets.GenericViewSet):
     """Base viewset for recipe atrributes"""
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeAttrCursorPagination
+    query_budgets = {
+        'list': 1,
+        'update': 5,
+        'partial_update': 5,
+        'destroy': 4,
+    }
+
+    def perform_update(self, serializer):
+        """Update the object, rejecting a name which is already used"""
+        # 중복 검사 query 대신 (user, name) unique constraint로 검사함
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise ValidationError({'name': ['This name is already in use.']})
 
     def get_queryset(self):
         """Filter queryset to authenticated user"""
-        assigned_only = bool(
-            int(self.request.query_params.get('assigned_only', 0))
-        )
-        queryset = self.queryset
-        if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-
-        return queryset.filter(
-            user=self.request.user
-            ).order_by('-name').distinct()
+        return filter_assigned(
+            self.queryset, self.request.query_params,
+        ).filter(user=self.request.user)
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
@@ -146,4 +280,64 @@ class TagViewSet(BaseRecipeAttrViewSet):
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients in the database"""
     serializer_class = serializers.IngredientSerializer
-    queryset = Ingredient.objects.all()
\ No newline at end of file
+    queryset = Ingredient.objects.all()
+
+
+class MediaContentNegotiation(DefaultContentNegotiation):
+    """Use the first renderer whatever media type the client accepts"""
+    # image 요청의 Accept header(image/webp 등)로 406이 나지 않도록 함
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+# 저장된 image와 variant의 확장자별 Content-Type
+IMAGE_CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.gif': 'image/gif',
+}
+
+
+class RecipeImageView(APIView):
+    """Serve recipe images and their variants to the recipe owner"""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = MediaContentNegotiation
+    # 파일 이름이 내용의 digest이므로 같은 URL의 내용은 바뀌지 않음
+    cache_control = 'private, max-age=31536000, immutable'
+
+    def get(self, request, name):
+        """Check the recipe owner and hand the file transfer to the proxy"""
+        if name.startswith('/') or os.path.normpath(name) != name:
+            raise NotFound()
+        if not Recipe.objects.filter(
+            user=request.user,
+            **source_lookup(name),
+        ).exists():
+            raise NotFound()
+
+        # 확장자로 추측하지 않고 image 형식만 image type으로 응답함
+        ext = os.path.splitext(name)[1].lower()
+        content_type = IMAGE_CONTENT_TYPES.get(
+            ext, 'application/octet-stream')
+        if settings.MEDIA_ACCEL_REDIRECT:
+            # 본문 없이 응답하고 proxy가 sendfile로 file을 전송함
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = (
+                settings.MEDIA_ACCEL_PREFIX + name)
+        else:
+            storage = Recipe._meta.get_field('image').storage
+            if not storage.exists(name):
+                raise NotFound()
+            response = FileResponse(
+                storage.open(name), content_type=content_type)
+        response['Cache-Control'] = self.cache_control
+        response['X-Content-Type-Options'] = 'nosniff'
+        if ext not in IMAGE_CONTENT_TYPES:
+            # 이전에 다른 확장자로 저장된 file은 browser가 열지 않도록 함
+            response['Content-Disposition'] = 'attachment'
+
+        return response
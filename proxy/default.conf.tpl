@@ -5,6 +5,31 @@ server {
         alias /vol/static;
     }
 
+    # media는 app이 권한을 확인한 뒤 X-Accel-Redirect로만 전송함
+    location /static/media {
+        return 404;
+    }
+
+    # 예전에 static volume에 저장된 cache file을 공개하지 않음
+    location /static/cache {
+        return 404;
+    }
+
+    location /protected/media/ {
+        internal;
+        alias /vol/static/media/;
+        sendfile on;
+        tcp_nopush on;
+        # Content-Type과 Cache-Control은 app 응답의 header를 그대로 사용함
+    }
+
+    # read only recipe API는 ASGI server가 처리함
+    location /api/async/ {
+        proxy_pass         http://${ASYNC_APP_HOST}:${ASYNC_APP_PORT};
+        proxy_set_header   Host $host;
+        proxy_set_header   X-Forwarded-For $proxy_add_x_forwarded_for;
+    }
+
     location / {
         uwsgi_pass           ${APP_HOST}:${APP_PORT};
         include              /etc/nginx/uwsgi_params;
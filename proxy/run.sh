@@ -2,5 +2,7 @@
 
 set -e
 
-envsubst < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
+# nginx 변수($host 등)는 치환하지 않도록 사용할 변수만 지정함
+envsubst '${LISTEN_PORT} ${APP_HOST} ${APP_PORT} ${ASYNC_APP_HOST} ${ASYNC_APP_PORT}' \
+    < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
 nginx -g 'daemon off;'
\ No newline at end of file
@@ -0,0 +1,11 @@
+#!/bin/sh
+
+set -e
+
+# 이전에 실행된 worker의 metric이 합산되지 않도록 지움
+rm -f "${PROMETHEUS_MULTIPROC_DIR:?}"/*.db
+
+python manage.py wait_for_db --timeout ${DB_WAIT_TIMEOUT:-60}
+
+# migrate와 collectstatic은 uwsgi container의 run.sh가 실행함
+uvicorn app.asgi:application --host 0.0.0.0 --port 9001 --workers ${ASGI_WORKERS:-2}
@@ -2,8 +2,16 @@
 
 set -e
 
-python manage.py wait_for_db
+# 이전에 실행된 worker의 metric이 합산되지 않도록 지움
+rm -f "${PROMETHEUS_MULTIPROC_DIR:?}"/*.db
+# 공개되는 static volume에 남아 있는 예전 cache file을 지움
+rm -rf /vol/web/cache
+
+python manage.py wait_for_db --timeout ${DB_WAIT_TIMEOUT:-60}
 python manage.py collectstatic --noinput
+python manage.py build_schema
 python manage.py migrate
+# 첫 요청이 DB buffer cache와 cache backend를 채우지 않도록 미리 읽어 둠
+python manage.py wait_for_db --warm-up
 
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
\ No newline at end of file
+uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi